@@ -1,288 +1,66 @@
-import csv
 import os
 import sys
 
+from inventory.backends import open_backend
+from inventory.formats import BinaryFormat, CsvFormat
+from inventory.stats import STATS
+
 # Candidate B version created by Banditdev
 """
 Command-Line Inventory Management System (CSV Version) (Candidate B)
+
+Candidate B's settings. The menu, formats and queries are shared, see
+inventory.menu and inventory.formats.
 """
 
 DATA_FILE = "inventory.csv"
-FIELDNAMES = ["id", "name", "price", "quantity"]
+PARSE_WORKERS = int(os.environ.get("INVENTORY_CSV_WORKERS", "0")) # 0 = one per CPU, 1 = never parallel
+JOURNAL_FILE = DATA_FILE + ".journal"
+USE_JOURNAL = os.environ.get("INVENTORY_JOURNAL") == "1" # Save appends changes to JOURNAL_FILE instead of rewriting the CSV
+BINARY_FILE = DATA_FILE + ".bin" # compact snapshot used instead of the CSV when INVENTORY_FORMAT=binary
+USE_BINARY = os.environ.get("INVENTORY_FORMAT") == "binary"
+READ_ONLY = os.environ.get("INVENTORY_READONLY") == "1" # query-only session, see inventory.menu.run_read_only
+DB_FILE = "inventory.db" # used instead of the files above when INVENTORY_BACKEND=sqlite, migrate with python -m inventory.migrate
+USE_SQLITE = os.environ.get("INVENTORY_BACKEND") == "sqlite"
+EVENTS = os.environ.get("INVENTORY_EVENTS", "") # change feed sinks, e.g. file:inventory.events.jsonl, see inventory.events
+HISTORY_FILE = (DB_FILE if USE_SQLITE else DATA_FILE) + ".history" # recent quantities per item for the stock-out forecast, on unless INVENTORY_STOCK_HISTORY=0
+USE_STOCK_HISTORY = os.environ.get("INVENTORY_STOCK_HISTORY", "1") != "0"
+
+TITLE = "Inventory Management (CSV)"
+# Entries from inventory.menu.COMMANDS, numbered in this order
+MENU = ["add", "view", "update", "remove", "search", "low", "save", "save_exit", "exit",
+        "stats", "valuation", "undo", "redo", "forecast"]
+READ_ONLY_MENU = ["view", "search", "low", "forecast"]
+
+def data_format():
+    """The CSV file, or the binary snapshot in binary mode (imported from the CSV until the first save)."""
+    fmt = CsvFormat(DATA_FILE, PARSE_WORKERS)
+    return BinaryFormat(BINARY_FILE, fmt) if USE_BINARY else fmt
+
+FORMAT = data_format()
 
 def load_data():
-    """Loads inventory data from the CSV file."""
-    if not os.path.exists(DATA_FILE):
-        return []
-    try:
-        with open(DATA_FILE, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            data = []
-            for row in reader:
-                # Convert types as CSV reads everything as strings
-                try:
-                    # Ensure all fields exist
-                    if not all(k in row for k in FIELDNAMES):
-                        continue
-                    
-                    item = {
-                        "id": row["id"],
-                        "name": row["name"],
-                        "price": float(row["price"]),
-                        "quantity": int(row["quantity"])
-                    }
-                    data.append(item)
-                except ValueError:
-                    continue # Skip rows with invalid number formats
-            return data
-    except Exception as e:
-        print(f"Warning: Could not read {DATA_FILE}. Starting with empty inventory. Error: {e}")
-        return []
+    return FORMAT.load()
 
 def save_data(inventory):
-    """Saves inventory data to the CSV file."""
-    try:
-        with open(DATA_FILE, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-            writer.writeheader()
-            writer.writerows(inventory)
-    except Exception as e:
-        print("Error saving data:", e)
-
-def print_menu(): 
-    print("\nInventory Management (CSV)")
-    print("--------------------------")
-    print("1) Add Item")
-    print("2) View Stock")
-    print("3) Update Item")
-    print("4) Remove Item")
-    print("5) Search by Name")
-    print("6) Low-stock Report")
-    print("7) Save")
-    print("8) Save & Exit")
-    print("9) Exit without Saving")
-
-def input_nonempty(prompt):
-    while True:
-        s = input(prompt).strip()
-        if s:
-            return s
-        print("Input cannot be empty.")
-
-def find_by_id(inventory, item_id):
-    for item in inventory:
-        if item.get("id") == item_id:
-            return item
-    return None
-
-def generate_unique_id(inventory):
-    # Generate numeric incremental ID as string
-    ids = []
-    for it in inventory:
-        try:
-            ids.append(int(it.get("id")))
-        except Exception:
-            pass
-    next_id = max(ids) + 1 if ids else 1
-    return str(next_id)
-
-def add_item(inventory):
-    print("\nAdd Item")
-    print("Leave ID blank to auto-generate.")
-    raw_id = input("ID: ").strip()
-    if not raw_id:
-        item_id = generate_unique_id(inventory)
-    else:
-        if find_by_id(inventory, raw_id):
-            print("Error: An item with that ID already exists.")
-            return
-        item_id = raw_id
-
-    name = input_nonempty("Name: ")
-    # price
-    while True:
-        p = input("Price: ").strip()
-        try:
-            price = float(p)
-            if price < 0:
-                print("Price must be non-negative.")
-                continue
-            break
-        except Exception:
-            print("Invalid price. Enter a number (e.g., 9.99).")
-    # quantity
-    while True:
-        q = input("Quantity: ").strip()
-        try:
-            quantity = int(q)
-            if quantity < 0:
-                print("Quantity must be non-negative.")
-                continue
-            break
-        except Exception:
-            print("Invalid quantity. Enter an integer (e.g., 5).")
-
-    inventory.append({"id": item_id, "name": name, "price": price, "quantity": quantity})
-    print(f"Added item {item_id} - {name}.")
-
-def format_table(rows, headers):
-    # compute widths
-    cols = list(zip(*([headers] + rows))) if rows else [[h] for h in headers]
-    widths = [max(len(str(x)) for x in col) for col in cols]
-    sep = " | "
-    line = "-+-".join("-" * w for w in widths)
-    header_line = sep.join(str(h).ljust(w) for h, w in zip(headers, widths))
-    out = header_line + "\n" + line + "\n"
-    for r in rows:
-        out += sep.join(str(c).ljust(w) for c, w in zip(r, widths)) + "\n"
-    return out
-
-def view_stock(inventory):
-    if not inventory:
-        print("\nInventory is empty.")
-        return
-    rows = []
-    for it in inventory:
-        rows.append([it.get("id"), it.get("name"), f"{it.get('price'):.2f}", it.get("quantity")])
-    print("\nCurrent Stock")
-    print(format_table(rows, ["ID", "Name", "Price", "Quantity"]))
-
-def update_item(inventory):
-    if not inventory:
-        print("\nInventory is empty.")
-        return
-    item_id = input_nonempty("Enter ID of item to update: ")
-    item = find_by_id(inventory, item_id)
-    if not item:
-        print("Item not found.")
-        return
-    print(f"Updating {item_id} - {item['name']}. Leave blank to keep current value.")
-    new_name = input(f"Name [{item['name']}]: ").strip()
-    if new_name:
-        item['name'] = new_name
-    while True:
-        new_price = input(f"Price [{item['price']:.2f}]: ").strip()
-        if not new_price:
-            break
-        try:
-            p = float(new_price)
-            if p < 0:
-                print("Price must be non-negative.")
-                continue
-            item['price'] = p
-            break
-        except Exception:
-            print("Invalid price.")
-    while True:
-        new_q = input(f"Quantity [{item['quantity']}]: ").strip()
-        if not new_q:
-            break
-        try:
-            q = int(new_q)
-            if q < 0:
-                print("Quantity must be non-negative.")
-                continue
-            item['quantity'] = q
-            break
-        except Exception:
-            print("Invalid quantity.")
-    print("Item updated.")
-
-def remove_item(inventory):
-    if not inventory:
-        print("\nInventory is empty.")
-        return
-    item_id = input_nonempty("Enter ID of item to remove: ")
-    item = find_by_id(inventory, item_id)
-    if not item:
-        print("Item not found.")
-        return
-    confirm = input(f"Confirm delete {item_id} - {item['name']}? (y/N): ").strip().lower()
-    if confirm == 'y':
-        inventory.remove(item)
-        print("Item removed.")
+    """Returns False if the save failed."""
+    return FORMAT.save(inventory)
+
+def make_backend(recover):
+    """Picks the storage engine, see inventory.backends. recover asks what to do with unsaved journal changes."""
+    return open_backend(FORMAT, JOURNAL_FILE if USE_JOURNAL else None, DB_FILE if USE_SQLITE else None,
+                        EVENTS, recover, HISTORY_FILE if USE_STOCK_HISTORY else None)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv: # batch mode, see inventory.cli
+        from inventory.cli import refuse_recover, run
+        sys.exit(STATS.call("cli " + argv[0], run, argv, make_backend(refuse_recover)))
+    from inventory import menu # imported here, batch commands do not need the menu or what it loads
+    if READ_ONLY:
+        menu.run_read_only(make_backend(menu.ask_recover), TITLE, READ_ONLY_MENU)
     else:
-        print("Deletion cancelled.")
-
-def search_item(inventory):
-    if not inventory:
-        print("\nInventory is empty.")
-        return
-    term = input_nonempty("Search term (name, case-insensitive substring): ").lower()
-    results = []
-    for it in inventory:
-        if term in it.get("name", "").lower():
-            results.append([it.get("id"), it.get("name"), f"{it.get('price'):.2f}", it.get("quantity")])
-    if not results:
-        print("No matching items found.")
-        return
-    print(f"\nSearch results for '{term}':")
-    print(format_table(results, ["ID", "Name", "Price", "Quantity"]))
-
-def low_stock_report(inventory):
-    if not inventory:
-        print("\nInventory is empty.")
-        return
-    while True:
-        t = input("Report threshold (items with quantity < threshold). Enter integer (default 5): ").strip()
-        if not t:
-            threshold = 5
-            break
-        try:
-            threshold = int(t)
-            break
-        except Exception:
-            print("Invalid number.")
-    low = []
-    for it in inventory:
-        if int(it.get("quantity", 0)) < threshold:
-            low.append([it.get("id"), it.get("name"), it.get("quantity")])
-    if not low:
-        print(f"No items below {threshold}.")
-        return
-    print(f"\nLow-stock items (quantity < {threshold}):")
-    print(format_table(low, ["ID", "Name", "Quantity"]))
-
-def main():
-    inventory = load_data()
-    print("Loaded", len(inventory), "items.")
-    while True:
-        try:
-            print_menu()
-            choice = input("Choose an option (1-9): ").strip()
-            if choice == "1":
-                add_item(inventory)
-            elif choice == "2":
-                view_stock(inventory)
-            elif choice == "3":
-                update_item(inventory)
-            elif choice == "4":
-                remove_item(inventory)
-            elif choice == "5":
-                search_item(inventory)
-            elif choice == "6":
-                low_stock_report(inventory)
-            elif choice == "7":
-                save_data(inventory)
-                print("Saved.")
-            elif choice == "8":
-                save_data(inventory)
-                print("Saved. Exiting.")
-                break
-            elif choice == "9":
-                confirm = input("Exit without saving? (y/N): ").strip().lower()
-                if confirm == 'y':
-                    print("Exiting without saving.")
-                    break
-                else:
-                    print("Cancelled.")
-            else:
-                print("Invalid choice.")
-        except KeyboardInterrupt:
-            print("\nInterrupted. Use menu to save and exit or exit without saving.")
-        except Exception as e:
-            print("An error occurred:", e)
+        menu.run(make_backend(menu.ask_recover), TITLE, MENU)
 
 if __name__ == "__main__":
     main()
-
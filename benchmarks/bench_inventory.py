@@ -0,0 +1,165 @@
+"""
+Benchmarks for the JSON and CSV candidates on synthetic inventories.
+
+    python benchmarks/bench_inventory.py                      # 10k, 100k and 1M items
+    python benchmarks/bench_inventory.py --sizes 10000 --out bench.json
+    python benchmarks/bench_inventory.py --sizes 10000 --compare bench.json
+
+For each size and candidate it times load_data and save_data, then the
+queries behind find_by_id, generate_unique_id, search_item, search_price
+and low_stock_report (the menu functions themselves prompt with input(),
+so the inventory calls they make are timed instead). Peak memory of each
+load is measured in a separate tracemalloc run so it does not skew the
+timings. Results are written as JSON, tagged with the git commit, so runs
+can be compared across candidates and across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import Inventory_Code_csv  # noqa: E402
+import Inventory_Code_json  # noqa: E402
+
+CANDIDATES = {"json": Inventory_Code_json, "csv": Inventory_Code_csv}
+WORDS = ["steel", "bolt", "washer", "nut", "hinge", "bracket", "cable", "tie", "clamp", "pipe",
+         "valve", "seal", "spring", "gear", "belt", "chain", "hook", "panel", "screw", "rivet"]
+
+
+def make_items(n, seed=42):
+    """n random items with numeric ids, 2-3 word names, prices and quantities."""
+    rnd = random.Random(seed)
+    return [{"id": str(i),
+             "name": " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 3))) + f" {rnd.randint(1, 999)}",
+             "price": round(rnd.uniform(0.1, 500), 2),
+             "quantity": rnd.randint(0, 200)}
+            for i in range(1, n + 1)]
+
+
+def timed(fn, repeat=1):
+    """Best wall time of repeat calls, and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_candidate(name, module, items, queries=200):
+    from inventory.store import Inventory
+
+    results = []
+
+    def record(op, seconds, per=1, **extra):
+        results.append({"candidate": name, "size": len(items), "op": op,
+                        "seconds": seconds, "per_call": seconds / per, **extra})
+
+    seed = Inventory.from_items(items, len(items) + 1)
+    t, ok = timed(lambda: module.save_data(seed))
+    record("save_data", t, bytes=os.path.getsize(module.DATA_FILE))
+
+    t, inv = timed(module.load_data)
+    record("load_data", t, peak_bytes=peak_memory(module.load_data))
+
+    rnd = random.Random(1)
+    ids = [rnd.choice(items)["id"] for _ in range(queries)]
+    t, _ = timed(lambda: [inv.get(i) for i in ids])
+    record("find_by_id", t, queries)
+
+    t, _ = timed(lambda: [inv.new_id() for _ in range(queries)])
+    record("generate_unique_id", t, queries)
+
+    terms = [rnd.choice(WORDS)[:rnd.randint(3, 5)] for _ in range(20)]
+    t, _ = timed(lambda: [inv.search_name(term) for term in terms])
+    record("search_item", t, len(terms))
+
+    bands = [(lo, lo + 5) for lo in (rnd.uniform(0, 495) for _ in range(20))]
+    t, _ = timed(lambda: [inv.price_range(lo, hi) for lo, hi in bands])
+    record("search_price", t, len(bands))
+
+    t, _ = timed(lambda: [inv.below_quantity(th) for th in (1, 5, 10, 20)])
+    record("low_stock_report", t, 4)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new):
+    # Prints per-call time ratios of new against old for matching rows
+    key = lambda r: (r["candidate"], r["size"], r["op"])  # noqa: E731
+    before = {key(r): r for r in old["results"]}
+    print(f"\n{'candidate':9} {'size':>8} {'op':20} {'old s/call':>12} {'new s/call':>12} {'ratio':>7}")
+    for r in new["results"]:
+        o = before.get(key(r))
+        if o is None:
+            continue
+        ratio = r["per_call"] / o["per_call"] if o["per_call"] else float("inf")
+        flag = "  <-- slower" if ratio > 1.2 else ""
+        print(f"{r['candidate']:9} {r['size']:>8} {r['op']:20} {o['per_call']:12.6f} {r['per_call']:12.6f} {ratio:7.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inventory load/save/query benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--candidates", nargs="+", choices=sorted(CANDIDATES), default=sorted(CANDIDATES))
+    parser.add_argument("--out", help="write results to this JSON file (default: stdout)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    cwd = os.getcwd()
+    for size in args.sizes:
+        items = make_items(size)
+        for name in args.candidates:
+            # The candidates use relative data file names, so each run gets a scratch directory
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                try:
+                    rows = bench_candidate(name, CANDIDATES[name], items)
+                finally:
+                    os.chdir(cwd)
+            for r in rows:
+                print(f"{r['candidate']:5} {r['size']:>8} {r['op']:20} {r['seconds']:9.4f}s", file=sys.stderr)
+            results.extend(rows)
+
+    report = {"commit": git_commit(), "python": platform.python_version(),
+              "platform": platform.platform(), "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Shared code for the inventory management candidates.
+
+The main classes can be imported from the package itself:
+
+    from inventory import Inventory, Item, JsonFormat
+
+Submodules are imported the first time one of their names is used, so
+importing the package costs nothing and a menu session never loads the
+batch command line, the export engine or sqlite3 unless it needs them.
+"""
+import importlib
+
+# name -> submodule that defines it
+_EXPORTS = {
+    "Item": "item",
+    "Inventory": "store",
+    "StorageBackend": "backends",
+    "FileBackend": "backends",
+    "open_backend": "backends",
+    "SqliteBackend": "sqlite_store",
+    "SqliteInventory": "sqlite_store",
+    "JsonFormat": "formats",
+    "CsvFormat": "formats",
+    "BinaryFormat": "formats",
+    "JsonlFormat": "formats",
+    "Aggregates": "aggregates",
+    "History": "history",
+    "Transaction": "history",
+    "ChangeFeed": "events",
+    "StockHistory": "forecast",
+    "STATS": "stats",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value  # later lookups skip this function
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
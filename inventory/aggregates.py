@@ -0,0 +1,140 @@
+"""
+Running totals for the valuation report.
+
+Aggregates listens to an inventory (see Inventory.listeners) and adjusts
+its totals on every add, update and remove, so the report never has to
+walk the items: the summary is O(1) and the category rollup is
+O(categories). Minimum and maximum price come from the store's sorted
+price index through price_bounds().
+
+recompute() works everything out from scratch, vectorised with NumPy when
+it is installed, and verify() checks the running totals against it.
+"""
+import math
+
+from inventory.optional import numpy
+
+NO_CATEGORY = ""  # rollup key for items without a category
+
+
+def _blank():
+    return {"count": 0, "quantity": 0, "value": 0.0}
+
+
+class Aggregates:
+    """Item count, units, stock value and price sum, overall and per category."""
+
+    def __init__(self, store):
+        self.store = store
+        totals = recompute(store)
+        self.count = totals["count"]
+        self.quantity = totals["quantity"]
+        self.value = totals["value"]
+        self.price_sum = totals["price_sum"]
+        self.categories = totals["categories"]
+
+    @classmethod
+    def track(cls, store):
+        """Builds the totals for store and keeps them up to date from then on."""
+        totals = cls(store)
+        store.listeners.append(totals.apply)
+        return totals
+
+    def apply(self, op, item_id, old, new):
+        # Listener: take the old version out and put the new one in
+        if old is not None:
+            self._add(old, -1)
+        if new is not None:
+            self._add(new, 1)
+
+    def _add(self, item, sign):
+        price, quantity = item["price"], item["quantity"]
+        self.count += sign
+        self.quantity += sign * quantity
+        self.value += sign * price * quantity
+        self.price_sum += sign * price
+        if not self.count:
+            # Start again from exact zeros so float error cannot build up
+            self.value = self.price_sum = 0.0
+        cat = item.get("category") or NO_CATEGORY
+        c = self.categories.get(cat)
+        if c is None:
+            c = self.categories[cat] = _blank()
+        c["count"] += sign
+        c["quantity"] += sign * quantity
+        c["value"] += sign * price * quantity
+        if not c["count"]:
+            del self.categories[cat]
+
+    def summary(self):
+        low, high = self.store.price_bounds()
+        return {
+            "count": self.count,
+            "quantity": self.quantity,
+            "value": self.value,
+            "min_price": low,
+            "max_price": high,
+            "avg_price": self.price_sum / self.count if self.count else None,
+        }
+
+    def verify(self):
+        """Returns a list of differences between the running totals and a full recompute."""
+        fresh = recompute(self.store)
+        summary = self.summary()
+        problems = []
+        for key in ("count", "quantity", "value", "min_price", "max_price", "avg_price"):
+            if not _close(summary[key], fresh[key]):
+                problems.append(f"{key}: running {summary[key]!r}, recomputed {fresh[key]!r}")
+        for cat in set(self.categories) | set(fresh["categories"]):
+            mine, theirs = self.categories.get(cat, _blank()), fresh["categories"].get(cat, _blank())
+            for key in ("count", "quantity", "value"):
+                if not _close(mine[key], theirs[key]):
+                    problems.append(f"category {cat!r} {key}: running {mine[key]!r}, recomputed {theirs[key]!r}")
+        return problems
+
+
+def _close(a, b):
+    if a is None or b is None:
+        return a is b
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+
+
+def recompute(items):
+    """Works out the totals from scratch with one pass over items."""
+    items = list(items)
+    n = len(items)
+    if not n:
+        return {"count": 0, "quantity": 0, "value": 0.0, "price_sum": 0.0,
+                "min_price": None, "max_price": None, "avg_price": None, "categories": {}}
+    cats = [it.get("category") or NO_CATEGORY for it in items]
+    np = numpy()
+    if np is not None:
+        prices = np.fromiter((it["price"] for it in items), dtype=np.float64, count=n)
+        quantities = np.fromiter((it["quantity"] for it in items), dtype=np.int64, count=n)
+        values = prices * quantities
+        names, which = np.unique(np.array(cats), return_inverse=True)
+        counts = np.bincount(which)
+        units = np.bincount(which, weights=quantities)
+        worth = np.bincount(which, weights=values)
+        categories = {str(c): {"count": int(counts[i]), "quantity": int(units[i]), "value": float(worth[i])}
+                      for i, c in enumerate(names)}
+        price_sum = float(prices.sum())
+        totals = {"count": n, "quantity": int(quantities.sum()), "value": float(values.sum()),
+                  "price_sum": price_sum, "min_price": float(prices.min()), "max_price": float(prices.max())}
+    else:
+        prices = [it["price"] for it in items]
+        values = [it["price"] * it["quantity"] for it in items]
+        categories = {}
+        for cat, it, value in zip(cats, items, values):
+            c = categories.get(cat)
+            if c is None:
+                c = categories[cat] = _blank()
+            c["count"] += 1
+            c["quantity"] += it["quantity"]
+            c["value"] += value
+        price_sum = math.fsum(prices)
+        totals = {"count": n, "quantity": sum(it["quantity"] for it in items), "value": math.fsum(values),
+                  "price_sum": price_sum, "min_price": min(prices), "max_price": max(prices)}
+    totals["avg_price"] = price_sum / n
+    totals["categories"] = categories
+    return totals
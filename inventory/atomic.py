@@ -0,0 +1,63 @@
+"""
+Crash-safe file replacement.
+
+The new contents go to a temporary file in the same directory, which is
+fsynced and then renamed over the real file. A crash at any point leaves
+either the old file or the new one, never a half-written mix.
+"""
+import os
+from contextlib import contextmanager
+
+
+def fsync_dir(path):
+    # Makes a rename in this directory durable. Not possible on Windows,
+    # where the rename is already as durable as it gets.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _mode_for(path):
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextmanager
+def atomic_write(path, mode="w", **open_args):
+    """Opens a temporary file to write path's new contents to.
+
+    The file replaces path only if the with-block finishes without an
+    exception; otherwise it is deleted and path is left untouched.
+    """
+    import tempfile  # only needed once something is saved, so it stays out of start-up
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with open(fd, mode, **open_args) as f:
+            # mkstemp makes the file 0600 and the rename would keep that, so give
+            # it the mode of the file it replaces (or the usual one for a new file)
+            if hasattr(os, "fchmod"):  # not on Windows, where mkstemp's mode does not matter
+                os.fchmod(f.fileno(), _mode_for(path))
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    fsync_dir(directory)
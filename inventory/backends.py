@@ -0,0 +1,281 @@
+"""
+Storage backends.
+
+The menu and the batch commands only talk to a backend: load() gives them
+an inventory store (Inventory, or a SqliteInventory that works directly on
+the database), save() makes its changes durable and discard() throws away
+unsaved changes. The business logic is the same for every backend.
+"""
+from inventory.journal import open_journal, read_committed
+from inventory.locking import file_stamp, try_lock, wait_lock
+
+
+def _call(fn):
+    return fn()
+
+
+def _same(a, b):
+    # Items compare the same whether an empty category is stored as "",
+    # None (after an undo) or, as Item.as_dict() writes it, not at all
+    if a is None or b is None:
+        return a is b
+    return {k: v for k, v in a.items() if v not in (None, "")} == {k: v for k, v in b.items() if v not in (None, "")}
+
+
+class StorageBackend:
+    """Interface every storage engine implements."""
+
+    # True when each change is committed as it is made, so Save has nothing
+    # to do and Exit without Saving cannot undo anything
+    autocommit = False
+    lock_timeout = 5.0  # seconds a save waits for another session's lock
+
+    def __init__(self):
+        # Listeners added to every store load() returns, e.g. a change feed
+        self.listeners = []
+        # Called with no arguments after every successful save, e.g. to
+        # save the stock history along with the inventory
+        self.on_save = []
+        self.stock_history = None  # see inventory.forecast
+        # Runs fn() and returns its result. Saves make the changes merged in
+        # from other sessions through this, so a caller that reads the store
+        # from another thread (the service) can run them where they cannot
+        # interleave with its reads.
+        self.run_changes = _call
+
+    def load(self):
+        """Returns the inventory store."""
+        raise NotImplementedError
+
+    def open_read_only(self):
+        """Returns a store for queries only. By default the normal store."""
+        return self.load()
+
+    def save(self, inventory):
+        """Makes all changes durable. Returns False if that failed."""
+        raise NotImplementedError
+
+    def discard(self, inventory):
+        """Called on Exit without Saving."""
+
+    def close(self):
+        pass
+
+    def _saved(self):
+        # The inventory itself is saved by now, so a failing hook only warns
+        for fn in self.on_save:
+            try:
+                fn()
+            except Exception as e:
+                print("Warning: the inventory was saved, but", getattr(fn, "__qualname__", fn), "failed:", e)
+        return True
+
+
+class FileBackend(StorageBackend):
+    """Whole-file snapshots (JSON, CSV or binary), optionally with a journal.
+
+    load_data/save_data load and save the snapshot (usually a format
+    adapter's load and save, see inventory.formats) and path is the
+    snapshot file they use. With a journal_path, saves append
+    to the journal (see inventory.journal) and the snapshot is only
+    rewritten when the journal is compacted.
+
+    Several sessions may edit the same snapshot. Saves are serialised with
+    a lock file, and if another session saved since this one loaded, its
+    changes are merged in first: every item this session changed is
+    checked against the version it started from, and if the other session
+    changed it too, the other session's version wins and the item is
+    reported as a conflict. Items both sessions added under the same ID
+    are both kept, this session's under a new ID. Journal mode needs a
+    single writer, so it holds the lock for the whole session instead.
+    The on_save hooks run under the same lock, so files saved alongside
+    the snapshot (the stock history) are merged and written in turn too.
+    """
+
+    def __init__(self, load_data, save_data, path, journal_path=None, recover=None, read_only=None):
+        super().__init__()
+        self._load_data = load_data
+        self._save_data = save_data
+        self.path = path
+        self._lock_path = path + ".lock"
+        self._journal_path = journal_path
+        self._recover = recover
+        self._read_only = read_only
+        self.journal = None
+        self._session_lock = None
+        self._stamp = None
+        self._changes = {}  # id -> (item as loaded or None, item now or None)
+        self.conflicts = []  # ids whose changes the last save dropped
+        self.renumbered = {}  # old id -> new id of items the last save moved out of the way
+
+    def load(self):
+        if self._journal_path:
+            self._session_lock = try_lock(self._lock_path)
+            if self._session_lock is None:
+                raise RuntimeError(f"another session is editing {self.path}; journal mode allows only one")
+        # Stamp first: if a save lands between the two, the next save merges
+        # needlessly, which is harmless
+        self._stamp = file_stamp(self.path)
+        inventory = self._load_data()
+        if self._journal_path:
+            self.journal = open_journal(inventory, self._journal_path, self._recover)
+        else:
+            inventory.listeners.append(self._track)
+        inventory.listeners.extend(self.listeners)
+        return inventory
+
+    def _track(self, op, item_id, old, new):
+        base = self._changes[item_id][0] if item_id in self._changes else old
+        self._changes[item_id] = (base, new)
+
+    def _merge(self, inventory):
+        # Brings inventory up to date with the snapshot on disk, keeping
+        # this session's changes unless they clash. Returns the clashes
+        # and the items added here that had to be renumbered.
+        # Only reading the snapshot happens here, the rest through run_changes.
+        disk = self._load_data()
+        return self.run_changes(lambda: self._apply(inventory, disk))
+
+    def _apply(self, inventory, disk):
+        mine, conflicts, clashes = self._compare(disk)
+        renumbered = self._renumber(inventory, disk, clashes)
+        mine.update(renumbered.values())
+        # Changes applied here are someone else's, so our own change
+        # tracking (and listeners such as the change feed that only want
+        # this session's changes) do not hear about them. Other listeners,
+        # such as running totals, still do.
+        listeners = inventory.listeners
+        inventory.listeners = [fn for fn in listeners
+                               if fn != self._track and not getattr(fn, "own_changes_only", False)]
+        try:
+            for item in disk:
+                item_id = item["id"]
+                if item_id in mine:
+                    continue
+                current = inventory.get(item_id)
+                if current is None:
+                    inventory.add(dict(item))
+                elif not _same(current, item):
+                    # Replaced whole, so a field they cleared (a category) is cleared here too
+                    inventory.replace(dict(item))
+            for item in list(inventory):
+                if item["id"] not in disk and item["id"] not in mine:
+                    inventory.remove(item["id"])
+            inventory.next_id = max(inventory.next_id, disk.next_id)
+        finally:
+            inventory.listeners = listeners
+        return conflicts, renumbered
+
+    def _compare(self, disk):
+        # Sorts this session's changes into the ones that still apply, the
+        # ones the other session overrode, and adds that clash with its adds
+        mine, conflicts, clashes = set(), [], []
+        for item_id, (base, new) in self._changes.items():
+            theirs = disk.get(item_id)
+            if _same(theirs, base) or _same(theirs, new):
+                mine.add(item_id)
+            elif base is None:
+                # Both sessions added an item under this ID (usually the
+                # same auto-generated one): different items, keep both
+                clashes.append(item_id)
+            else:
+                conflicts.append(item_id)
+        return mine, conflicts, clashes
+
+    def _renumber(self, inventory, disk, item_ids):
+        # Moves this session's items to IDs above both sides' high-water
+        # marks. The move is this session's own change, so everything
+        # listening (change tracking, the change feed) hears it.
+        renumbered = {}
+        inventory.next_id = max(inventory.next_id, disk.next_id)
+        for item_id in item_ids:
+            item = inventory.get(item_id)
+            if item is None:  # added, then removed again here
+                continue
+            item = dict(item, id=inventory.new_id())
+            inventory.remove(item_id)
+            inventory.add(item)
+            renumbered[item_id] = item["id"]
+        return renumbered
+
+    def open_read_only(self):
+        # Read-only stores read the snapshot only, so they would miss
+        # changes that are still in the journal. Nothing here takes the
+        # lock, so this works while a journal session is open.
+        if self._journal_path:
+            return read_committed(self._load_data, self._journal_path)
+        if self._read_only is None:
+            return self._load_data()
+        return self._read_only()
+
+    def save(self, inventory):
+        journal = self.journal
+        if journal is None:
+            lock = wait_lock(self._lock_path, self.lock_timeout)
+            if lock is None:
+                print(f"Error saving data: another session holds the lock on {self.path} "
+                      "(a journal session keeps it until it exits). Try again later.")
+                return False
+            with lock:
+                self.conflicts, self.renumbered = [], {}
+                if file_stamp(self.path) != self._stamp:
+                    self.conflicts, self.renumbered = self._merge(inventory)
+                    self._report_merge()
+                if not self._save_data(inventory):
+                    return False
+                self._stamp = file_stamp(self.path)
+                self._changes = {}
+                return self._saved()
+        journal.commit()
+        if journal.needs_compaction(len(inventory)):
+            # Fold the journal into a fresh snapshot, keeping it if the snapshot could not be written
+            if self._save_data(inventory):
+                journal.reset()
+        return self._saved()
+
+    def _report_merge(self):
+        if self.conflicts:
+            print(f"Warning: another session also changed {len(self.conflicts)} of the items you changed. "
+                  f"Kept their version of: {', '.join(map(str, self.conflicts[:20]))}"
+                  + (" ..." if len(self.conflicts) > 20 else ""))
+        if self.renumbered:
+            moves = [f"{old} -> {new}" for old, new in list(self.renumbered.items())[:20]]
+            print(f"Warning: another session added items with the same IDs as {len(self.renumbered)} of yours. "
+                  f"Yours were renumbered: {', '.join(moves)}" + (" ..." if len(self.renumbered) > 20 else ""))
+
+    def discard(self, inventory):
+        if self.journal is not None:
+            self.journal.discard_uncommitted()
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+        if self._session_lock is not None:
+            self._session_lock.close()
+            self._session_lock = None
+
+
+def open_backend(fmt, journal_path=None, db_path=None, events="", recover=None, history_path=None):
+    """Picks the storage engine for a candidate's settings.
+
+    fmt is a file format adapter (see inventory.formats) and is used unless
+    db_path is given. events is a change feed spec, see inventory.events.
+    With history_path, quantity changes are recorded for forecasting and
+    saved there with every save, see inventory.forecast.
+    """
+    if db_path:
+        # Imported here so sqlite3 is only loaded by sessions that use it
+        from inventory.sqlite_store import SqliteBackend
+        backend = SqliteBackend(db_path)
+    else:
+        backend = FileBackend(fmt.load, fmt.save, fmt.path, journal_path, recover, fmt.open_read_only)
+    if events:
+        # Every add, update and remove is also sent to the change feed
+        from inventory.events import ChangeFeed
+        backend.listeners.append(ChangeFeed.from_spec(events))
+    if history_path:
+        from inventory.forecast import StockHistory
+        backend.stock_history = StockHistory.load(history_path)
+        backend.listeners.append(backend.stock_history)
+        backend.on_save.append(backend.stock_history.save)
+    return backend
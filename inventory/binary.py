@@ -0,0 +1,143 @@
+"""
+Compact binary snapshot format.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header        magic b"INVBIN1\\0", item count n, next_id    (3 x 8 bytes)
+    prices        n doubles
+    quantities    n int64
+    id offsets    n + 1 int64, byte offsets into the id blob
+    name offsets  n + 1 int64, byte offsets into the name blob
+    id blob       UTF-8 ids, back to back
+    name blob     UTF-8 names, back to back
+
+and, only when some item has a category, after padding the name blob:
+
+    category offsets  n + 1 int64
+    category blob     UTF-8 categories, empty for items without one
+
+Readers that predate categories stop at the name blob, so files with and
+without the category sections are readable by both.
+
+Loading is a handful of bulk array copies plus one decode per blob, which
+is far quicker than json.load or csv.DictReader on big inventories.
+"""
+import struct
+import sys
+from array import array
+
+from inventory.atomic import atomic_write
+
+MAGIC = b"INVBIN1\0"
+HEADER = struct.Struct("<8sqq")
+
+
+def little_endian(arr):
+    """Byte-swaps arr in place on big-endian machines and returns it.
+
+    Arrays use the machine byte order, the files (this one and the jsonl
+    index, see inventory.lazy) are always little-endian. The swap is its
+    own inverse, so this converts both ways.
+    """
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _pad(n):
+    return -n % 8
+
+
+def _pack_strings(strings):
+    offsets = array("q", [0])
+    parts = []
+    end = 0
+    for s in strings:
+        b = s.encode("utf-8")
+        parts.append(b)
+        end += len(b)
+        offsets.append(end)
+    return offsets, b"".join(parts)
+
+
+def write_snapshot(path, items, next_id):
+    """Atomically writes items (dicts with id, name, price, quantity, optional category) to path."""
+    items = list(items)
+    prices = array("d", (it["price"] for it in items))
+    quantities = array("q", (it["quantity"] for it in items))
+    id_offsets, id_blob = _pack_strings(str(it["id"]) for it in items)
+    name_offsets, name_blob = _pack_strings(str(it["name"]) for it in items)
+    categories = [it.get("category") or "" for it in items]
+    with atomic_write(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(items), next_id))
+        for arr in (prices, quantities, id_offsets, name_offsets):
+            f.write(little_endian(arr).tobytes())
+        f.write(id_blob)
+        f.write(b"\0" * _pad(len(id_blob)))
+        f.write(name_blob)
+        if any(categories):
+            cat_offsets, cat_blob = _pack_strings(categories)
+            f.write(b"\0" * _pad(len(name_blob)))
+            f.write(little_endian(cat_offsets).tobytes())
+            f.write(cat_blob)
+
+
+class Sections:
+    """Locations of the sections in a snapshot held in a bytes-like buffer."""
+
+    def __init__(self, buf):
+        magic, n, next_id = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("not an inventory snapshot")
+        self.count = n
+        self.next_id = next_id
+        self.prices = HEADER.size
+        self.quantities = self.prices + 8 * n
+        self.id_offsets = self.quantities + 8 * n
+        self.name_offsets = self.id_offsets + 8 * (n + 1)
+        self.id_blob = self.name_offsets + 8 * (n + 1)
+        id_len = struct.unpack_from("<q", buf, self.name_offsets - 8)[0]
+        self.name_blob = self.id_blob + id_len + _pad(id_len)
+        name_len = struct.unpack_from("<q", buf, self.id_blob - 8)[0]
+        end = self.name_blob + name_len + _pad(name_len)
+        # Optional sections, None in files without categories
+        self.category_offsets = self.category_blob = None
+        if len(buf) > end:
+            self.category_offsets = end
+            self.category_blob = end + 8 * (n + 1)
+
+    def array(self, buf, typecode, start, count):
+        arr = array(typecode)
+        arr.frombytes(buf[start:start + 8 * count])
+        return little_endian(arr)
+
+
+def _unpack_strings(blob, offsets):
+    if blob.isascii():
+        # Byte offsets are character offsets, so decode once and slice
+        text = blob.decode("ascii")
+        return [text[a:b] for a, b in zip(offsets, offsets[1:])]
+    return [blob[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+
+
+def read_snapshot(path):
+    """Returns (items, next_id) from a snapshot written by write_snapshot."""
+    with open(path, "rb") as f:
+        buf = f.read()
+    sec = Sections(buf)
+    n = sec.count
+    prices = sec.array(buf, "d", sec.prices, n)
+    quantities = sec.array(buf, "q", sec.quantities, n)
+    id_offsets = sec.array(buf, "q", sec.id_offsets, n + 1)
+    name_offsets = sec.array(buf, "q", sec.name_offsets, n + 1)
+    ids = _unpack_strings(buf[sec.id_blob:sec.id_blob + id_offsets[-1]], id_offsets)
+    names = _unpack_strings(buf[sec.name_blob:sec.name_blob + name_offsets[-1]], name_offsets)
+    items = [{"id": i, "name": nm, "price": p, "quantity": q}
+             for i, nm, p, q in zip(ids, names, prices, quantities)]
+    if sec.category_offsets is not None:
+        cat_offsets = sec.array(buf, "q", sec.category_offsets, n + 1)
+        cats = _unpack_strings(buf[sec.category_blob:sec.category_blob + cat_offsets[-1]], cat_offsets)
+        for item, cat in zip(items, cats):
+            if cat:
+                item["category"] = cat
+    return items, sec.next_id
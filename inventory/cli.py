@@ -0,0 +1,350 @@
+"""
+Non-interactive command line for the inventory candidates.
+
+Every menu action has a subcommand, so the tool can be driven from cron
+jobs and pipelines without going through input() prompts:
+
+    python Inventory_Code_json.py add --name Pen --price 1.20 --quantity 40
+    python Inventory_Code_json.py import stock.jsonl
+    python Inventory_Code_json.py report --threshold 3 --json
+    python Inventory_Code_json.py view --offset 100 --limit 50
+    python Inventory_Code_json.py export stock.csv.gz --workers 8
+    python Inventory_Code_json.py forecast --lead-days 10 --limit 20
+
+Changing commands load the inventory, apply the change and save once.
+Query commands and export use the backend's read-only store, so with a
+file backend they never build the full list of item dicts.
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+from itertools import chain, islice
+
+from inventory.export import export, low_stock, valuation
+from inventory.forecast import LEAD_DAYS, forecast, stockout_date
+from inventory.item import Item, parse_name, parse_price, parse_quantity, parse_text
+from inventory.table import write_table
+
+FORMATS = ("csv", "json", "jsonl")
+
+
+def _fail(message):
+    print("Error:", message, file=sys.stderr)
+    return 1
+
+
+def refuse_recover(count):
+    """Journal recovery callback: batch commands cannot ask, so unsaved journal changes are left for the menu."""
+    print(f"Error: the journal holds {count} unsaved changes. Start the menu to recover or discard them.", file=sys.stderr)
+    sys.exit(1)
+
+
+def _format_of(path, given):
+    if given:
+        return given
+    if path.lower().endswith(".gz"):
+        path = path[:-3]
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in FORMATS:
+        return ext
+    if ext == "ndjson":
+        return "jsonl"
+    raise ValueError(f"cannot tell the format of {path}, use --format")
+
+
+# --- import ------------------------------------------------------------
+
+def read_records(path, fmt):
+    """Reads raw records (dicts of whatever the file holds) from path, gunzipping *.gz files."""
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            return list(csv.DictReader(f))
+        if fmt == "jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        raise ValueError("expected a list of items")
+    return data
+
+
+def validate_records(records, inventory):
+    """Checks every record with the add_item rules in one pass.
+
+    Returns (items, errors). items is only usable when errors is empty.
+    Blank ids are given fresh ids, other ids must be new and unique.
+    """
+    items, errors = [], []
+    seen = set()
+    for n, rec in enumerate(records, 1):
+        try:
+            item = Item.from_record(rec)
+        except ValueError as e:
+            errors.append(f"record {n}: {e}")
+            continue
+        if item.id:
+            if item.id in seen or item.id in inventory:
+                errors.append(f"record {n}: an item with ID {item.id} already exists")
+            seen.add(item.id)
+        items.append(item.as_dict())
+    if errors:
+        return [], errors
+    _fill_ids(items, int(inventory.new_id()))
+    return items, []
+
+
+def _fill_ids(items, next_id):
+    # Explicit numeric ids in the batch move the high-water mark too
+    for item in items:
+        try:
+            next_id = max(next_id, int(item["id"]) + 1)
+        except ValueError:
+            pass
+    for item in items:
+        if not item["id"]:
+            item["id"] = str(next_id)
+            next_id += 1
+
+
+# --- commands ----------------------------------------------------------
+
+def _print_items(items, args, columns=("ID", "Name", "Price", "Quantity"), widths=None):
+    # Streams the selected slice of items to stdout without building the output
+    stop = None if args.limit is None else args.offset + args.limit
+    items = islice(items, args.offset, stop)
+    if args.json:
+        out = sys.stdout
+        for item in items:
+            out.write(json.dumps(item, ensure_ascii=False) + "\n")
+        return
+    first = next(items, None)
+    if first is None:
+        print("No matching items found.")
+        return
+    cells = {"ID": "id", "Name": "name", "Price": "price", "Quantity": "quantity", "Match": "match",
+             "Per day": "rate", "Days left": "days_left", "Runs out": "runs_out", "Reorder at": "reorder_point"}
+    formats = {"Price": "{:.2f}", "Match": "{:.0%}", "Per day": "{:.2f}", "Days left": "{:.1f}"}
+    rows = ([formats[c].format(it[cells[c]]) if c in formats else it[cells[c]] for c in columns]
+            for it in chain([first], items))
+    write_table(rows, list(columns), widths=widths)
+
+
+def _print_valuation(totals, as_json):
+    if as_json:
+        print(json.dumps(totals, ensure_ascii=False))
+        return
+    if not totals["count"]:
+        print("Inventory is empty.")
+        return
+    print(f"Items: {totals['count']}  Units: {totals['quantity']}  Total value: {totals['value']:.2f}")
+    print(f"Price min {totals['min_price']:.2f}  avg {totals['avg_price']:.2f}  max {totals['max_price']:.2f}")
+    rows = [[cat or "(none)", c["count"], c["quantity"], f"{c['value']:.2f}"]
+            for cat, c in sorted(totals["categories"].items(), key=lambda kv: -kv[1]["value"])]
+    write_table(rows, ["Category", "Items", "Units", "Value"])
+
+
+def _count(text):
+    # argparse type for --limit, --offset and --top, which islice() needs non-negative
+    try:
+        n = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}") from None
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, not {n}")
+    return n
+
+
+def _add_output_options(p):
+    p.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    p.add_argument("--limit", type=_count, help="show at most this many items")
+    p.add_argument("--offset", type=_count, default=0, help="skip this many items first")
+
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Inventory management. Run with no arguments for the menu.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("view", help="list the stock")
+    _add_output_options(p)
+
+    p = sub.add_parser("add", help="add one item")
+    p.add_argument("--id", default="", help="leave out to auto-generate")
+    p.add_argument("--name", required=True)
+    p.add_argument("--price", type=float, required=True)
+    p.add_argument("--quantity", type=int, required=True)
+    p.add_argument("--category", default="")
+
+    p = sub.add_parser("update", help="change fields of one item")
+    p.add_argument("id")
+    p.add_argument("--name")
+    p.add_argument("--price", type=float)
+    p.add_argument("--quantity", type=int)
+    p.add_argument("--category", help="an empty string clears it")
+
+    p = sub.add_parser("remove", help="remove one item")
+    p.add_argument("id")
+
+    p = sub.add_parser("search", help="search by name and/or price range")
+    p.add_argument("term", nargs="?", help="case-insensitive name substring")
+    p.add_argument("--prefix", action="store_true", help="match the start of the name only")
+    p.add_argument("--fuzzy", action="store_true", help="rank names similar to the term, for misspellings")
+    p.add_argument("--top", type=_count, default=10, help="with --fuzzy, how many matches to show (default 10)")
+    p.add_argument("--price-range", nargs=2, type=float, metavar=("LOW", "HIGH"))
+    _add_output_options(p)
+
+    p = sub.add_parser("report", help="low-stock report")
+    p.add_argument("--threshold", type=int, default=5, help="items with quantity < threshold (default 5)")
+    p.add_argument("--workers", type=int, help="scan with this many processes instead of the store's query")
+    _add_output_options(p)
+
+    p = sub.add_parser("forecast", help="items ranked by days until they run out at their recent rate of use")
+    p.add_argument("--lead-days", type=float, default=LEAD_DAYS,
+                   help=f"reorder lead time, sets each item's reorder point (default {LEAD_DAYS})")
+    p.add_argument("--reorder", action="store_true", help="only items at or below their reorder point")
+    _add_output_options(p)
+
+    p = sub.add_parser("valuation", help="stock value, price stats and category totals")
+    p.add_argument("--workers", type=int, help="processes for big inventories (default: one per core)")
+    p.add_argument("--json", action="store_true", help="print JSON instead of a table")
+
+    p = sub.add_parser("import", help="validate and add every item in a file, saving once")
+    p.add_argument("file")
+    p.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+
+    p = sub.add_parser("export", help="write the whole inventory to a file")
+    p.add_argument("file")
+    p.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    p.add_argument("--gzip", action="store_true", help="compress the output (default for *.gz files)")
+    p.add_argument("--workers", type=int, help="processes for big inventories (default: one per core)")
+    return parser
+
+
+# Query commands get the backend's read-only store, changing commands the
+# loaded inventory and return the message to print once it is saved.
+# Both report a refused command by raising ValueError.
+
+def _view(args, inventory, backend):
+    _print_items(iter(inventory), args, widths=[0, inventory.max_name_length()])
+
+
+def _search(args, inventory, backend):
+    if args.term is None and args.price_range is None:
+        raise ValueError("give a search term and/or --price-range")
+    columns = ("ID", "Name", "Price", "Quantity")
+    if args.term is None:
+        items = inventory.price_range(*args.price_range)
+    elif args.fuzzy:
+        items = [dict(it, match=round(score, 3)) for it, score in inventory.search_fuzzy(args.term, args.top)]
+        columns += ("Match",)
+    else:
+        items = inventory.search_name(args.term, args.prefix)
+    if args.term is not None and args.price_range:
+        low, high = args.price_range
+        items = [it for it in items if low <= it["price"] <= high]
+    _print_items(iter(items), args, columns)
+
+
+def _report(args, inventory, backend):
+    if args.workers:
+        items = low_stock(inventory, args.threshold, args.workers, len(inventory))
+    else:
+        items = inventory.below_quantity(args.threshold)
+    _print_items(iter(items), args, ("ID", "Name", "Quantity"))
+
+
+def _forecast(args, inventory, backend):
+    if backend.stock_history is None:
+        raise ValueError("stock history is off (INVENTORY_STOCK_HISTORY=0)")
+    items = [dict(f, runs_out=stockout_date(f)) for f in forecast(backend.stock_history, inventory, args.lead_days)
+             if f["reorder"] or not args.reorder]
+    _print_items(iter(items), args, ("ID", "Name", "Quantity", "Per day", "Days left", "Runs out", "Reorder at"))
+
+
+def _valuation(args, inventory, backend):
+    _print_valuation(valuation(inventory, args.workers, len(inventory)), args.json)
+
+
+def _export(args, inventory, backend):
+    fmt = _format_of(args.file, args.format)
+    compress = args.gzip or args.file.lower().endswith(".gz")
+    export(args.file, inventory, fmt, compress, args.workers, len(inventory))
+    print(f"Exported {len(inventory)} items to {args.file}.")
+
+
+def _add(args, inventory):
+    items, errors = validate_records([vars(args)], inventory)
+    if errors:
+        raise ValueError(errors[0].replace("record 1: ", ""))
+    inventory.add(items[0])
+    return f"Added item {items[0]['id']} - {items[0]['name']}."
+
+
+def _update(args, inventory):
+    if args.id not in inventory:
+        raise ValueError("Item not found.")
+    changes = {k: getattr(args, k) for k in ("name", "price", "quantity", "category")
+               if getattr(args, k) is not None}
+    # The add_item rules, so nan, inf and negatives are turned away here too
+    if "price" in changes:
+        changes["price"] = parse_price(changes["price"])
+    if "quantity" in changes:
+        changes["quantity"] = parse_quantity(changes["quantity"])
+    if "name" in changes:
+        changes["name"] = parse_name(changes["name"])
+    if "category" in changes:
+        changes["category"] = parse_text(changes["category"], "category")
+    inventory.update(args.id, **changes)
+    return "Item updated."
+
+
+def _remove(args, inventory):
+    if args.id not in inventory:
+        raise ValueError("Item not found.")
+    inventory.remove(args.id)
+    return "Item removed."
+
+
+def _import(args, inventory):
+    records = read_records(args.file, _format_of(args.file, args.format))
+    items, errors = validate_records(records, inventory)
+    if errors:
+        for e in errors[:20]:
+            print(e, file=sys.stderr)
+        if len(errors) > 20:
+            print(f"... and {len(errors) - 20} more", file=sys.stderr)
+        raise ValueError(f"nothing imported, {len(errors)} invalid records")
+    inventory.extend(items)
+    return f"Imported {len(items)} items."
+
+
+QUERIES = {"view": _view, "search": _search, "report": _report, "forecast": _forecast,
+           "valuation": _valuation, "export": _export}
+CHANGES = {"add": _add, "update": _update, "remove": _remove, "import": _import}
+
+
+def run(argv, backend, prog=None):
+    """Runs one subcommand against a StorageBackend and returns the exit status. Closes the backend."""
+    try:
+        return _run(build_parser(prog).parse_args(argv), backend)
+    finally:
+        backend.close()
+
+
+def _run(args, backend):
+    try:
+        if args.command in QUERIES:
+            QUERIES[args.command](args, backend.open_read_only(), backend)
+            return 0
+        inventory = backend.load()
+        message = CHANGES[args.command](args, inventory)
+    except (OSError, RuntimeError, ValueError) as e:  # RuntimeError: the backend could not load
+        return _fail(e)
+    if not backend.save(inventory):
+        return 1
+    print(message)
+    return 0
@@ -0,0 +1,66 @@
+"""
+Queries shared by the read-only column stores.
+
+ColumnStore (see inventory.columns) and MappedInventory (see
+inventory.mapped) both keep prices and quantities as flat number columns
+and can decode row i on demand. RowQueries answers everything that only
+needs that much; each store keeps the queries that depend on how it
+holds its strings (search_name, max_name_length).
+
+A store using it provides __len__, id_at(i), name_at(i), item_at(i) and
+prices and quantities as buffers of float64 and int64 in machine order
+(arrays or cast memoryviews).
+"""
+from inventory.name_index import MIN_SCORE, NameIndex
+from inventory.optional import numpy
+
+
+class RowQueries:
+    """Mixin with the row-number based queries of the read-only stores."""
+
+    _pos = None  # id -> row, built on first get()
+    _fuzzy = None  # fuzzy search index over row numbers, built on first search_fuzzy()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.item_at(i)
+
+    def __contains__(self, item_id):
+        return self.get(item_id) is not None
+
+    def get(self, item_id):
+        # Built backwards so the first row wins when the source repeats an id
+        if self._pos is None:
+            self._pos = {}
+            for i in range(len(self) - 1, -1, -1):
+                self._pos[self.id_at(i)] = i
+        i = self._pos.get(item_id)
+        return None if i is None else self.item_at(i)
+
+    def price_range(self, low, high):
+        # Items with low <= price <= high, cheapest first
+        np = numpy()
+        if np is not None:
+            p = np.frombuffer(self.prices, dtype=np.float64)
+            rows = np.flatnonzero((p >= low) & (p <= high)).tolist()
+        else:
+            rows = [i for i, p in enumerate(self.prices) if low <= p <= high]
+        rows.sort(key=self.prices.__getitem__)
+        return [self.item_at(i) for i in rows]
+
+    def below_quantity(self, threshold):
+        # Items with quantity < threshold, lowest stock first
+        np = numpy()
+        if np is not None:
+            rows = np.flatnonzero(np.frombuffer(self.quantities, dtype=np.int64) < threshold).tolist()
+        else:
+            rows = [i for i, q in enumerate(self.quantities) if q < threshold]
+        rows.sort(key=self.quantities.__getitem__)
+        return [self.item_at(i) for i in rows]
+
+    def search_fuzzy(self, term, k=10, min_score=MIN_SCORE):
+        # Up to k (item, score) pairs, best first. The stores never change,
+        # so the index is built once, over row numbers.
+        if self._fuzzy is None:
+            self._fuzzy = NameIndex.for_fuzzy((i, self.name_at(i)) for i in range(len(self)))
+        return [(self.item_at(i), score) for score, i in self._fuzzy.similar(term, k, min_score)]
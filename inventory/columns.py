@@ -0,0 +1,106 @@
+"""
+Compact read-only column store for large inventories.
+
+Instead of one dict per item, prices and quantities live in typed arrays
+and ids and names are packed into one string each with an offsets array.
+This takes a fraction of the memory of a list of dicts, and scans over a
+column are tight loops (or NumPy calls when NumPy is installed).
+
+ColumnStore answers the same queries as Inventory (iteration, get,
+price_range, below_quantity, search_name), so view_stock, search_price,
+low_stock_report and search_item work on either.
+"""
+import io
+from array import array
+from bisect import bisect_right
+
+from inventory.columnar import RowQueries
+
+
+def _pack(strings):
+    # Joins strings into one str with an offsets array: string i is
+    # blob[offsets[i]:offsets[i + 1]].
+    buf = io.StringIO()
+    offsets = array("q", [0])
+    end = 0
+    for s in strings:
+        buf.write(s)
+        end += len(s)
+        offsets.append(end)
+    return buf.getvalue(), offsets
+
+
+class ColumnStore(RowQueries):
+    """Read-only inventory held as columns.
+
+    If the source has duplicate ids all rows are kept, and get() returns
+    the first one.
+    """
+
+    def __init__(self, ids, names, prices, quantities, categories=None):
+        self._ids, self._id_offsets = _pack(ids)
+        self._names, self._name_offsets = _pack(names)
+        # Lowercased names get their own blob, lower() can change lengths
+        self._lower, self._lower_offsets = _pack(n.lower() for n in names)
+        self.prices = array("d", prices)
+        self.quantities = array("q", quantities)
+        # Only packed when at least one item has a category
+        self._cats, self._cat_offsets = _pack(categories) if categories and any(categories) else (None, None)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds a store from (id, name, price, quantity, category) tuples, e.g. csv_rows.iter_rows."""
+        ids, names, categories = [], [], []
+        prices, quantities = array("d"), array("q")
+        for item_id, name, price, quantity, category in rows:
+            ids.append(item_id)
+            names.append(name)
+            prices.append(price)
+            quantities.append(quantity)
+            categories.append(category)
+        return cls(ids, names, prices, quantities, categories)
+
+    @classmethod
+    def from_items(cls, items):
+        return cls.from_rows((it["id"], it["name"], it["price"], it["quantity"], it.get("category") or "")
+                             for it in items)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def id_at(self, i):
+        return self._ids[self._id_offsets[i]:self._id_offsets[i + 1]]
+
+    def name_at(self, i):
+        return self._names[self._name_offsets[i]:self._name_offsets[i + 1]]
+
+    def item_at(self, i):
+        item = {"id": self.id_at(i), "name": self.name_at(i),
+                "price": self.prices[i], "quantity": self.quantities[i]}
+        if self._cats is not None and self._cat_offsets[i] != self._cat_offsets[i + 1]:
+            item["category"] = self._cats[self._cat_offsets[i]:self._cat_offsets[i + 1]]
+        return item
+
+    # --- queries -------------------------------------------------------
+
+    def search_name(self, term, prefix=False):
+        # str.find over the packed lowercased names runs in C; each hit is
+        # mapped back to its row through the offsets array.
+        term = term.lower()
+        blob, offsets = self._lower, self._lower_offsets
+        rows = []
+        pos = blob.find(term)
+        while pos != -1:
+            i = bisect_right(offsets, pos) - 1
+            # skip matches that run past the end of this name or that are
+            # not at its start when only prefixes are wanted
+            if pos + len(term) <= offsets[i + 1] and (not prefix or pos == offsets[i]):
+                rows.append(i)
+                pos = blob.find(term, offsets[i + 1])
+            else:
+                pos = blob.find(term, pos + 1)
+        return [self.item_at(i) for i in rows]
+
+    def max_name_length(self):
+        o = self._name_offsets
+        return max((o[i + 1] - o[i] for i in range(len(self))), default=0)
@@ -0,0 +1,126 @@
+"""
+Streaming and parallel readers for inventory CSV files.
+
+Rows come back typed (price as float, quantity as int). Rows with a blank
+ID or name, or an invalid or negative price or quantity, are skipped.
+The category column is optional, files written before it existed read as
+having no categories.
+"""
+import csv
+import io
+import os
+
+from inventory.item import parse_price, parse_quantity
+
+FIELDNAMES = ["id", "name", "price", "quantity", "category"]
+REQUIRED = FIELDNAMES[:4]
+CHUNK_BYTES = 32 * 1024 * 1024  # target size of one parallel parse job
+
+
+def _columns(header):
+    # Positions of the wanted fields in the header, or None if a required
+    # one is missing (category is None when the file has no such column).
+    # Checked once per file rather than once per row.
+    try:
+        cols = [header.index(k) for k in REQUIRED]
+    except ValueError:
+        return None
+    return cols + [header.index("category") if "category" in header else None]
+
+
+def _typed(rows, cols):
+    # The same field rules as Item.from_record (which the other formats
+    # load through), applied to the row's fields without building an Item
+    i_id, i_name, i_price, i_qty, i_cat = cols
+    for row in rows:
+        try:
+            item_id, name = row[i_id].strip(), row[i_name].strip()
+            if not item_id or not name:
+                continue
+            category = row[i_cat].strip() if i_cat is not None and i_cat < len(row) else ""
+            yield item_id, name, parse_price(row[i_price]), parse_quantity(row[i_qty]), category
+        except (IndexError, ValueError):
+            continue
+
+
+def iter_rows(path):
+    """Yields (id, name, price, quantity, category) tuples one row at a time.
+
+    Memory use does not depend on file size, so report-style commands can
+    run over exports far larger than RAM.
+    """
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        cols = _columns(next(reader, []))
+        if cols is None:
+            return
+        yield from _typed(reader, cols)
+
+
+def iter_items(path):
+    """Same as iter_rows but yields item dicts."""
+    for row in iter_rows(path):
+        yield row_item(row)
+
+
+def row_item(row):
+    """Turns a typed row into an item dict, leaving out an empty category."""
+    item_id, name, price, quantity, category = row
+    item = {"id": item_id, "name": name, "price": price, "quantity": quantity}
+    if category:
+        item["category"] = category
+    return item
+
+
+def _parse_chunk(job):
+    path, start, end, cols = job
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    return list(_typed(csv.reader(io.StringIO(text, newline="")), cols))
+
+
+def _chunk_bounds(path, data_start, size, chunk_bytes):
+    # Cut the file into roughly equal chunks, moving each cut forward to
+    # just after the next newline so no row is split between two jobs.
+    bounds = [data_start]
+    with open(path, "rb") as f:
+        pos = data_start + chunk_bytes
+        while pos < size:
+            f.seek(pos)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            bounds.append(pos)
+            pos += chunk_bytes
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def read_rows_parallel(path, workers=None, chunk_bytes=CHUNK_BYTES):
+    """Parses a large CSV with a process pool and returns all typed rows in file order.
+
+    The file is split on line boundaries, so this assumes no field contains
+    a newline. Item.from_record and the update commands turn such fields
+    away, so files this program wrote never have one.
+    """
+    with open(path, "rb") as f:
+        header_line = f.readline()
+        data_start = f.tell()
+    header = next(csv.reader([header_line.decode("utf-8")]), [])
+    cols = _columns(header)
+    if cols is None:
+        return []
+    size = os.path.getsize(path)
+    jobs = [(path, start, end, cols) for start, end in _chunk_bounds(path, data_start, size, chunk_bytes)]
+    if len(jobs) == 1:
+        return _parse_chunk(jobs[0])
+    rows = []
+    # Imported here: the process pool machinery is slow to import and only big files need it
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_parse_chunk, jobs):
+            rows.extend(part)
+    return rows
@@ -0,0 +1,175 @@
+"""
+Change feed: one structured event per add, update and remove.
+
+Downstream tools (replenishment, report caches) can follow the feed and
+sync incrementally instead of re-reading and diffing the data file after
+every save. Each event is one JSON object:
+
+    {"session": "3f2a9c1b7d4e", "seq": 12, "ts": "2026-10-16T09:30:00.123Z",
+     "time": 1792143000.123, "op": "update", "id": "42", "old": {...}, "new": {...}}
+
+seq counts up from 1 within each session (one run of the menu, a batch
+command or the service), so (session, seq) orders a session's events.
+old is null for "add" and new is null for "remove". Events are sent as
+changes are made, before Save, so a feed can show changes that are later
+thrown away with Exit without Saving.
+
+Sinks are chosen with a spec, several separated by commas:
+
+    file:PATH    JSON lines appended to PATH, rotated at 8 MB with 5 backups
+    unix:PATH    datagrams to a Unix socket, see `python -m inventory.events listen PATH`
+
+The candidates read the spec from INVENTORY_EVENTS.
+"""
+import argparse
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+
+ROTATE_BYTES = 8 * 1024 * 1024
+BACKUPS = 5
+
+
+class RotatingFileSink:
+    """Appends events to path, moving it to path.1 (path.1 to path.2, ...) when it gets too big.
+
+    Lines are flushed but not fsynced, the feed is not the system of record.
+    """
+
+    def __init__(self, path, max_bytes=ROTATE_BYTES, backups=BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._f = open(path, "ab")
+        self._size = self._f.tell()
+
+    def write(self, line):
+        data = line.encode("utf-8") + b"\n"
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._f.write(data)
+        self._f.flush()
+        self._size += len(data)
+
+    def _rotate(self):
+        self._f.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, self.path + ".1")
+        self._f = open(self.path, "wb")
+        self._size = 0
+
+    def close(self):
+        self._f.close()
+
+
+class UnixSocketSink:
+    """Sends each event as one datagram to a Unix socket.
+
+    Never blocks the menu: if nobody is listening or the reader falls
+    behind, events are dropped and counted in dropped.
+    """
+
+    def __init__(self, path):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix sockets are not available on this platform")
+        self.path = path
+        self.dropped = 0
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+
+    def write(self, line):
+        try:
+            self._sock.sendto(line.encode("utf-8"), self.path)
+        except OSError:
+            self.dropped += 1
+
+    def close(self):
+        self._sock.close()
+
+
+SINKS = {"file": RotatingFileSink, "unix": UnixSocketSink}
+
+
+def open_sinks(spec):
+    """Opens the sinks in a spec such as "file:events.jsonl,unix:/tmp/inventory.sock"."""
+    sinks = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, sep, path = part.partition(":")
+        if not sep or kind not in SINKS:
+            raise ValueError(f"unknown event sink {part!r}, expected file:PATH or unix:PATH")
+        sinks.append(SINKS[kind](path))
+    return sinks
+
+
+class ChangeFeed:
+    """Inventory listener that turns every change into an event for its sinks."""
+
+    # Changes merged in from another session's save are that session's
+    # events, so FileBackend does not pass them on to this listener
+    own_changes_only = True
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+        self.session = uuid.uuid4().hex[:12]
+        self.seq = 0
+
+    @classmethod
+    def from_spec(cls, spec):
+        return cls(open_sinks(spec))
+
+    def __call__(self, op, item_id, old, new):
+        self.seq += 1
+        now = time.time()
+        event = {
+            "session": self.session,
+            "seq": self.seq,
+            "ts": datetime.fromtimestamp(now, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "time": now,
+            "op": op,
+            "id": item_id,
+            "old": old,
+            "new": new,
+        }
+        line = json.dumps(event, ensure_ascii=False)
+        for sink in self.sinks:
+            sink.write(line)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def listen(path):
+    """Prints the events sent to a Unix socket sink, one JSON line each."""
+    if os.path.exists(path):
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(path)
+    try:
+        while True:
+            print(sock.recv(1 << 20).decode("utf-8"), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+        os.unlink(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inventory.events", description="Follow the inventory change feed.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("listen", help="print events sent to a unix: sink")
+    p.add_argument("path")
+    args = parser.parse_args(argv)
+    listen(args.path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
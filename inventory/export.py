@@ -0,0 +1,184 @@
+"""
+Parallel export and report engine.
+
+The inventory is cut into shards of SHARD_ROWS rows. Each shard is sent to
+a ProcessPoolExecutor worker as plain tuples. The worker formats it (CSV,
+JSON lines or part of a JSON array), gzip-compresses it when asked, and
+returns bytes. The parent writes the shards to the output in order as they
+come back, with at most a few shards in flight, so memory stays flat
+however big the export is.
+
+gzip output works because a gzip file may be several members back to
+back: every shard is its own member, compressed in parallel, and any gzip
+reader sees one continuous stream.
+
+Reports use the same sharding as a map-reduce. Each worker summarises its
+shard, then the parent merges the partial results.
+
+Inventories smaller than PARALLEL_MIN_ROWS are done in-process, where
+starting workers would cost more than it saves.
+"""
+import csv
+import gzip
+import heapq
+import io
+import json
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from inventory.atomic import atomic_write
+from inventory.csv_rows import FIELDNAMES, row_item
+
+SHARD_ROWS = 50000
+PARALLEL_MIN_ROWS = 200000
+
+
+def _rows(items):
+    # Plain tuples pickle far quicker than dicts on the way to the workers
+    for it in items:
+        yield it["id"], it["name"], it["price"], it["quantity"], it.get("category") or ""
+
+
+def _shards(items, size):
+    rows = _rows(items)
+    while True:
+        shard = list(islice(rows, size))
+        if not shard:
+            return
+        yield shard
+
+
+def _ordered(pool, fn, jobs, window):
+    # Like pool.map, but with at most `window` jobs submitted ahead of the
+    # one being consumed, so finished shards do not pile up in memory
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, *job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _run(fn, jobs, workers, parallel):
+    if not parallel or workers == 1:
+        return (fn(*job) for job in jobs)
+    return _pooled(fn, jobs, workers)
+
+
+def _pooled(fn, jobs, workers):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from _ordered(pool, fn, jobs, 2 * (workers or os.cpu_count() or 1))
+
+
+# --- export ------------------------------------------------------------
+
+def _format_shard(shard, fmt, compress):
+    if fmt == "csv":
+        buf = io.StringIO(newline="")
+        csv.writer(buf, lineterminator="\r\n").writerows(shard)
+        text = buf.getvalue()
+    elif fmt == "jsonl":
+        text = "".join(json.dumps(row_item(row), ensure_ascii=False) + "\n" for row in shard)
+    else:
+        # A piece of the array: items separated by commas, no brackets
+        text = ",".join(json.dumps(row_item(row), ensure_ascii=False) for row in shard)
+    data = text.encode("utf-8")
+    return gzip.compress(data, compresslevel=6) if compress else data
+
+
+def export(path, items, fmt, compress=False, workers=None, count=None):
+    """Writes items to path in fmt ("csv", "json" or "jsonl"), atomically.
+
+    count is the number of items if known, used to decide whether a
+    process pool is worth starting. workers=1 keeps everything in-process.
+    """
+    parallel = count is None or count >= PARALLEL_MIN_ROWS
+    jobs = ((shard, fmt, compress) for shard in _shards(items, SHARD_ROWS))
+
+    def pack(data):
+        return gzip.compress(data) if compress else data
+
+    with atomic_write(path, "wb") as f:
+        if fmt == "csv":
+            f.write(pack((",".join(FIELDNAMES) + "\r\n").encode("utf-8")))
+        elif fmt == "json":
+            f.write(pack(b"["))
+        first = True
+        for data in _run(_format_shard, jobs, workers, parallel):
+            if fmt == "json" and not first:
+                f.write(pack(b","))
+            f.write(data)
+            first = False
+        if fmt == "json":
+            f.write(pack(b"]"))
+
+
+# --- reports -----------------------------------------------------------
+
+def _value_shard(shard):
+    prices = [r[2] for r in shard]
+    categories = {}
+    for _, _, price, quantity, category in shard:
+        c = categories.get(category)
+        if c is None:
+            c = categories[category] = [0, 0, []]
+        c[0] += 1
+        c[1] += quantity
+        c[2].append(price * quantity)
+    return {
+        "count": len(shard),
+        "quantity": sum(r[3] for r in shard),
+        "value": math.fsum(r[2] * r[3] for r in shard),
+        "price_sum": math.fsum(prices),
+        "min_price": min(prices),
+        "max_price": max(prices),
+        "categories": {cat: (n, q, math.fsum(v)) for cat, (n, q, v) in categories.items()},
+    }
+
+
+def valuation(items, workers=None, count=None):
+    """Stock value, price stats and per-category totals in one sharded pass.
+
+    Returns the same shape as inventory.aggregates.recompute.
+    """
+    parallel = count is None or count >= PARALLEL_MIN_ROWS
+    parts = list(_run(_value_shard, ((shard,) for shard in _shards(items, SHARD_ROWS)), workers, parallel))
+    if not parts:
+        return {"count": 0, "quantity": 0, "value": 0.0, "price_sum": 0.0,
+                "min_price": None, "max_price": None, "avg_price": None, "categories": {}}
+    categories = {}
+    for part in parts:
+        for cat, (n, q, v) in part["categories"].items():
+            c = categories.setdefault(cat, {"count": 0, "quantity": 0, "value": 0.0})
+            c["count"] += n
+            c["quantity"] += q
+            c["value"] += v
+    n = sum(p["count"] for p in parts)
+    price_sum = math.fsum(p["price_sum"] for p in parts)
+    return {
+        "count": n,
+        "quantity": sum(p["quantity"] for p in parts),
+        "value": math.fsum(p["value"] for p in parts),
+        "price_sum": price_sum,
+        "min_price": min(p["min_price"] for p in parts),
+        "max_price": max(p["max_price"] for p in parts),
+        "avg_price": price_sum / n,
+        "categories": categories,
+    }
+
+
+def _low_shard(shard, threshold):
+    # sorted() is stable, so equal quantities stay in inventory order
+    return sorted((r for r in shard if r[3] < threshold), key=lambda r: r[3])
+
+
+def low_stock(items, threshold, workers=None, count=None):
+    """Items with quantity < threshold, lowest stock first, from a sharded scan."""
+    parallel = count is None or count >= PARALLEL_MIN_ROWS
+    parts = _run(_low_shard, ((shard, threshold) for shard in _shards(items, SHARD_ROWS)), workers, parallel)
+    # Shards come back in order, so merging keeps ties in inventory order
+    return [row_item(r) for r in heapq.merge(*parts, key=lambda r: r[3])]
@@ -0,0 +1,230 @@
+"""
+Reorder-point forecasting from each item's recent stock history.
+
+StockHistory listens to the inventory and keeps the last SAMPLES
+(time, quantity) readings of every item whose quantity has changed, in a
+fixed-size ring per item, so memory stays bounded however long the
+inventory is in use. Next to the ring it keeps the units consumed across
+the readings it holds (quantity drops; restocks do not count), adjusted
+in O(1) as readings arrive and old ones fall out of the ring.
+
+forecast() turns that into, for every item with consumption on record:
+
+    rate           units consumed per day since the oldest reading held
+    days_left      current quantity / rate
+    stockout       when the item is predicted to run out (a time.time() value)
+    reorder_point  units to cover the lead time at that rate; at or below
+                   it, the item should be reordered now
+
+computed for the whole catalogue in one vectorised pass (NumPy when it
+is installed) and ranked by days left.
+
+The history is saved next to the data file whenever the inventory is
+saved, under the data file's lock (see FileBackend), after merging in
+the readings other sessions saved since. It is a compact binary file
+(all little-endian):
+
+    header      magic b"INVHST1\\0", samples per item, item count, start time
+    per item    id length (uint16), UTF-8 id, reading count (uint16),
+                then that many (float64 time, int64 quantity) pairs, oldest first
+"""
+import math
+import struct
+import time
+from array import array
+from datetime import datetime
+
+from inventory.atomic import atomic_write
+from inventory.optional import numpy
+
+SAMPLES = 32  # readings kept per item
+LEAD_DAYS = 7  # default reorder lead time
+DAY = 86400.0
+MIN_DAYS = 1.0  # rates are spread over at least this long, so one early sale is not read as a huge rate
+
+MAGIC = b"INVHST1\0"
+HEADER = struct.Struct("<8sIId")
+ITEM = struct.Struct("<H")
+READING = struct.Struct("<dq")
+
+
+class _Series:
+    """Ring of the last readings of one item, with the units consumed across them."""
+
+    __slots__ = ("times", "quantities", "head", "count", "consumed")
+
+    def __init__(self, size):
+        self.times = array("d", bytes(8 * size))
+        self.quantities = array("q", bytes(8 * size))
+        self.head = 0  # slot of the oldest reading
+        self.count = 0
+        self.consumed = 0
+
+    def push(self, when, quantity):
+        size = len(self.times)
+        if self.count:
+            last = self.quantities[(self.head + self.count - 1) % size]
+            if self.count == size:
+                # The oldest reading falls out, and with it the drop to the one after it
+                dropped = self.quantities[self.head] - self.quantities[(self.head + 1) % size]
+                self.consumed -= max(dropped, 0)
+                self.head = (self.head + 1) % size
+                self.count -= 1
+            self.consumed += max(last - quantity, 0)
+        i = (self.head + self.count) % size
+        self.times[i] = when
+        self.quantities[i] = quantity
+        self.count += 1
+
+    def oldest(self):
+        return self.times[self.head]
+
+    def readings(self):
+        size = len(self.times)
+        return [(self.times[(self.head + k) % size], self.quantities[(self.head + k) % size])
+                for k in range(self.count)]
+
+
+class StockHistory:
+    """Inventory listener recording each item's quantity over time.
+
+    Only this session's changes are recorded. Changes merged in from other
+    sessions come with the readings those sessions saved, timed when they
+    were made, which save() merges item by item.
+    """
+
+    own_changes_only = True  # see FileBackend._merge
+
+    def __init__(self, path=None, samples=SAMPLES, started=None, clock=time.time):
+        self.path = path
+        self.samples = max(samples, 2)
+        self.clock = clock
+        # When recording began. An item's first change is taken to be the
+        # first since then, so its old quantity is dated from here.
+        self.started = clock() if started is None else started
+        self._series = {}
+        self._removed = set()  # ids removed in this session, not brought back from the file
+
+    def __len__(self):
+        return len(self._series)
+
+    def __call__(self, op, item_id, old, new):
+        if new is None:
+            self._series.pop(item_id, None)
+            self._removed.add(item_id)
+            return
+        self._removed.discard(item_id)
+        quantity = new.get("quantity", 0)
+        if old is not None and old.get("quantity", 0) == quantity:
+            return
+        series = self._series.get(item_id)
+        if series is None:
+            series = self._series[item_id] = _Series(self.samples)
+            if old is not None:
+                series.push(self.started, old.get("quantity", 0))
+        series.push(self.clock(), quantity)
+
+    def readings(self, item_id):
+        """The (time, quantity) readings held for item_id, oldest first."""
+        series = self._series.get(item_id)
+        return [] if series is None else series.readings()
+
+    def merge(self, other):
+        """Adds the readings of another history of the same items, keeping the latest per item."""
+        for item_id, theirs in other._series.items():
+            if item_id in self._removed:
+                continue
+            readings = theirs.readings()
+            mine = self._series.get(item_id)
+            if mine is not None:
+                # Readings both hold (e.g. loaded from the same file) count once
+                readings = sorted(set(readings).union(mine.readings()))
+            series = self._series[item_id] = _Series(self.samples)
+            for t, q in readings[-self.samples:]:
+                series.push(t, q)
+        self.started = min(self.started, other.started)
+
+    def save(self, path=None):
+        """Merges in what other sessions saved at path since, then writes the result there.
+
+        The caller holds the data file's lock, so nobody saves in between.
+        """
+        path = path or self.path
+        self.merge(StockHistory.load(path, self.clock))
+        with atomic_write(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.samples, len(self._series), self.started))
+            for item_id, series in self._series.items():
+                b = str(item_id).encode("utf-8")
+                f.write(ITEM.pack(len(b)) + b + ITEM.pack(series.count))
+                f.write(b"".join(READING.pack(t, q) for t, q in series.readings()))
+
+    @classmethod
+    def load(cls, path, clock=time.time):
+        """Reads the history saved at path. A missing or unreadable file starts a new history."""
+        try:
+            with open(path, "rb") as f:
+                buf = f.read()
+            magic, samples, n, started = HEADER.unpack_from(buf, 0)
+            if magic != MAGIC:
+                raise ValueError("not a stock history file")
+            history = cls(path, samples, started, clock)
+            pos = HEADER.size
+            for _ in range(n):
+                (length,) = ITEM.unpack_from(buf, pos)
+                item_id = buf[pos + 2:pos + 2 + length].decode("utf-8")
+                (count,) = ITEM.unpack_from(buf, pos + 2 + length)
+                pos += 4 + length
+                series = history._series[item_id] = _Series(history.samples)
+                for t, q in READING.iter_unpack(buf[pos:pos + count * READING.size]):
+                    series.push(t, q)
+                pos += count * READING.size
+        except (OSError, ValueError, struct.error):
+            return cls(path, clock=clock)
+        return history
+
+
+def forecast(history, store, lead_days=LEAD_DAYS, now=None):
+    """Items with consumption on record, most urgent first.
+
+    Returns a list of dicts with the item's id, name and quantity plus
+    rate, days_left, stockout, reorder_point and reorder (True when the
+    quantity is at or below the reorder point).
+    """
+    now = history.clock() if now is None else now
+    items, consumed, oldest = [], [], []
+    for item_id, series in history._series.items():
+        if series.consumed <= 0:
+            continue
+        item = store.get(item_id)
+        if item is not None:
+            items.append(item)
+            consumed.append(series.consumed)
+            oldest.append(series.oldest())
+    if not items:
+        return []
+    n = len(items)
+    np = numpy()
+    if np is not None:
+        quantity = np.fromiter((it["quantity"] for it in items), dtype=np.float64, count=n)
+        days = np.maximum((now - np.array(oldest)) / DAY, MIN_DAYS)
+        rate = np.array(consumed, dtype=np.float64) / days
+        days_left = quantity / rate
+        reorder_point = np.ceil(rate * lead_days)
+        order = np.argsort(days_left, kind="stable").tolist()
+        rate, days_left, reorder_point = rate.tolist(), days_left.tolist(), reorder_point.tolist()
+    else:
+        rate = [c / max((now - t) / DAY, MIN_DAYS) for c, t in zip(consumed, oldest)]
+        days_left = [it["quantity"] / r for it, r in zip(items, rate)]
+        reorder_point = [math.ceil(r * lead_days) for r in rate]
+        order = sorted(range(n), key=days_left.__getitem__)
+    return [{"id": items[i]["id"], "name": items[i]["name"], "quantity": items[i]["quantity"],
+             "rate": rate[i], "days_left": days_left[i], "stockout": now + days_left[i] * DAY,
+             "reorder_point": int(reorder_point[i]), "reorder": items[i]["quantity"] <= reorder_point[i]}
+            for i in order]
+
+
+def stockout_date(entry):
+    """A forecast entry's stock-out day as YYYY-MM-DD, or "-" if it is more than a century away."""
+    if entry["days_left"] > 36500:
+        return "-"
+    return datetime.fromtimestamp(entry["stockout"]).strftime("%Y-%m-%d")
@@ -0,0 +1,226 @@
+"""
+File formats the candidates keep their inventory in.
+
+Each format is an adapter with the same three methods, which is all
+FileBackend needs:
+
+    load()            the whole inventory as an Inventory
+    save(inventory)   write it, returning False (after printing why) on failure
+    open_read_only()  a compact store for query-only sessions
+
+JsonFormat and CsvFormat are the candidates' own files. BinaryFormat and
+JsonlFormat wrap one of them as their source: until the first save has
+written the new file, loading imports the source.
+"""
+import csv
+import json
+import os
+
+from inventory.atomic import atomic_write
+from inventory.binary import read_snapshot, write_snapshot
+from inventory.columns import ColumnStore
+from inventory.csv_rows import FIELDNAMES, iter_rows, read_rows_parallel, row_item
+from inventory.item import check_records
+from inventory.lazy import open_jsonl, write_jsonl
+from inventory.mapped import MappedInventory
+from inventory.name_index import NameIndex
+from inventory.store import Inventory
+
+PARALLEL_LOAD_BYTES = 64 * 1024 * 1024  # CSV files at least this big are parsed by a process pool
+
+
+def _save(write, *args):
+    try:
+        write(*args)
+    except Exception as e:
+        print("Error saving data:", e)
+        return False
+    return True
+
+
+def _start_fresh(path, error):
+    # An unreadable file is moved aside so the next save cannot overwrite it
+    print(f"Warning: could not read {path} ({error}).")
+    try:
+        os.rename(path, path + ".bak")
+        print(f"It was backed up to {path + '.bak'}. Starting fresh.")
+    except Exception:
+        print("Starting with empty inventory.")
+    return Inventory()
+
+
+def _warn_skipped(skipped, inventory, items):
+    if skipped:
+        print(f"Warning: skipped {skipped} items with a missing ID or name, or an invalid price or quantity.")
+    if len(inventory) < len(items):
+        print(f"Warning: skipped {len(items) - len(inventory)} items with duplicate IDs.")
+
+
+class JsonFormat:
+    """{"next_id": n, "items": [...]}, or a bare list of items in older files.
+
+    With name_cache, the name search index is also saved to that file and
+    reused on load while it matches the data file.
+    """
+
+    def __init__(self, path, name_cache=None):
+        self.path = path
+        self.name_cache = name_cache
+
+    def _read(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        next_id = 1
+        if isinstance(data, dict):  # current format also stores the ID high-water mark
+            try:
+                next_id = int(data.get("next_id", 1))
+            except (TypeError, ValueError):
+                next_id = 1  # from_items still moves it past every numeric ID
+            data = data.get("items")
+        if not isinstance(data, list):
+            raise ValueError("expected a list of items")
+        return data, next_id
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return Inventory()
+        try:
+            records, next_id = self._read()
+            items, skipped = check_records(records)
+            # The cached name index would still hold the skipped items
+            names = NameIndex.load(self.name_cache, self.path) if self.name_cache and not skipped else None
+            inventory = Inventory.from_items(items, next_id, names)
+        except Exception as e:
+            return _start_fresh(self.path, e)
+        _warn_skipped(skipped, inventory, items)
+        return inventory
+
+    def _write(self, inventory):
+        # Written to a temp file and renamed over path, so a crash mid-save cannot corrupt it
+        with atomic_write(self.path, "w", encoding="utf-8") as f:
+            # dumps() uses the C encoder, json.dump() to a file falls back to the pure-Python one
+            f.write(json.dumps({"next_id": inventory.next_id, "items": list(inventory)}, ensure_ascii=False))
+
+    def save(self, inventory):
+        if not _save(self._write, inventory):
+            return False
+        if self.name_cache:
+            try:
+                inventory.names.save(self.name_cache, self.path)
+            except Exception as e:
+                print("Warning: could not save the name index cache:", e)
+        return True
+
+    def open_read_only(self):
+        # Straight from the parsed JSON to columns, without building an Inventory and its indexes
+        if not os.path.exists(self.path):
+            return ColumnStore.from_rows([])
+        return ColumnStore.from_items(check_records(self._read()[0])[0])
+
+
+class CsvFormat:
+    """CSV with an id,name,price,quantity,category header.
+
+    CSV has no room for metadata, so the ID high-water mark is kept in
+    path.meta. Rows with missing fields or invalid numbers are skipped.
+    """
+
+    def __init__(self, path, workers=0, parallel_bytes=PARALLEL_LOAD_BYTES):
+        self.path = path
+        self.meta_path = path + ".meta"
+        self.workers = workers  # 0 = one per CPU, 1 = never parallel
+        self.parallel_bytes = parallel_bytes
+
+    def load_next_id(self):
+        """Reads the saved ID high-water mark, 1 if there is none."""
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return int(json.load(f)["next_id"])
+        except Exception:
+            return 1
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return Inventory()
+        try:
+            # Big exports are parsed in parallel, everything else is streamed row by row
+            if self.workers != 1 and os.path.getsize(self.path) >= self.parallel_bytes:
+                rows = read_rows_parallel(self.path, self.workers or None)
+            else:
+                rows = iter_rows(self.path)
+            # Duplicate IDs are dropped here, the first one wins
+            return Inventory.from_items(map(row_item, rows), self.load_next_id())
+        except Exception as e:
+            print(f"Warning: Could not read {self.path}. Starting with empty inventory. Error: {e}")
+            return Inventory()
+
+    def _write(self, inventory):
+        # Temp file + fsync + rename, so a crash mid-save leaves the old file intact
+        with atomic_write(self.path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(inventory)
+        with atomic_write(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({"next_id": inventory.next_id}, f)
+
+    def save(self, inventory):
+        return _save(self._write, inventory)
+
+    def open_read_only(self):
+        # Rows go straight into columns, without building item dicts
+        if not os.path.exists(self.path):
+            return ColumnStore.from_rows([])
+        return ColumnStore.from_rows(iter_rows(self.path))
+
+
+class BinaryFormat:
+    """Compact snapshot, see inventory.binary. Read-only sessions memory-map it."""
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self.source.load()
+        try:
+            records, next_id = read_snapshot(self.path)
+            items, skipped = check_records(records)
+            inventory = Inventory.from_items(items, next_id)
+        except Exception as e:
+            return _start_fresh(self.path, e)
+        _warn_skipped(skipped, inventory, items)
+        return inventory
+
+    def save(self, inventory):
+        return _save(write_snapshot, self.path, inventory, inventory.next_id)
+
+    def open_read_only(self):
+        if not os.path.exists(self.path):
+            return self.source.open_read_only()
+        return MappedInventory(self.path)
+
+
+class JsonlFormat:
+    """One item per line plus an offset index, opened lazily, see inventory.lazy."""
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+
+    def load(self):
+        # Only the offset index is read here, items are parsed on demand and by a background thread
+        if not os.path.exists(self.path):
+            return self.source.load()
+        try:
+            return open_jsonl(self.path)
+        except Exception as e:
+            return _start_fresh(self.path, e)
+
+    def save(self, inventory):
+        return _save(write_jsonl, self.path, inventory, inventory.next_id)
+
+    def open_read_only(self):
+        if not os.path.exists(self.path):
+            return self.source.open_read_only()
+        return self.load()
@@ -0,0 +1,213 @@
+"""
+Undo/redo and all-or-nothing batches of changes.
+
+Both work on diffs, never on copies of the inventory: a change is kept as
+(op, id, old, new) with old and new the item before and after, so memory
+grows with the number of changes and not with the catalogue.
+
+History is an inventory listener. Changes are grouped into steps with
+checkpoint() (the menus call it before every action, so one action is one
+step) and undo()/redo() apply a step backwards or forwards through the
+normal store methods, so journals, change feeds and running totals see
+them like any other change.
+
+Transaction stages add, update and remove in an overlay that reads fall
+through to. Nothing touches the store until commit(), which applies the
+whole batch or, if a change fails part way, reverts the ones already made.
+"""
+from collections import deque
+
+UNDO_STEPS = 200  # oldest steps are forgotten past this
+
+
+def _fill(item, other):
+    # Fields that only other has are set to None, so an update back to
+    # item also clears fields (such as category) that were added since
+    return dict({k: None for k in other if k not in item}, **item)
+
+
+def revert(store, changes):
+    """Undoes changes, a list of (op, id, old, new), newest first."""
+    for op, item_id, old, new in reversed(changes):
+        if op == "add":
+            store.remove(item_id)
+        elif op == "update":
+            store.update(item_id, **_fill(old, new))
+        else:
+            # A removed item comes back at the end of the list
+            store.add(dict(old))
+
+
+def reapply(store, changes):
+    """Makes changes again, oldest first."""
+    for op, item_id, old, new in changes:
+        if op == "add":
+            store.add(dict(new))
+        elif op == "update":
+            store.update(item_id, **_fill(new, old))
+        else:
+            store.remove(item_id)
+
+
+class History:
+    """Undo and redo stacks of change steps for one store."""
+
+    # Changes merged in from another session's save cannot be undone here
+    own_changes_only = True
+
+    def __init__(self, store, steps=UNDO_STEPS):
+        self.store = store
+        self._undo = deque(maxlen=steps)
+        self._redo = []
+        self._current = []
+        self._applying = False
+
+    @classmethod
+    def track(cls, store, steps=UNDO_STEPS):
+        history = cls(store, steps)
+        store.listeners.append(history)
+        return history
+
+    def __call__(self, op, item_id, old, new):
+        if self._applying:
+            return
+        self._current.append((op, item_id, old, new))
+        self._redo.clear()
+
+    def checkpoint(self):
+        """Closes the current step. Changes after this are a new step."""
+        if self._current:
+            self._undo.append(self._current)
+            self._current = []
+
+    def can_undo(self):
+        return bool(self._current or self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """Reverts the last step. Returns how many changes it had, 0 if there was nothing to undo."""
+        self.checkpoint()
+        if not self._undo:
+            return 0
+        step = self._undo.pop()
+        self._run(revert, step)
+        self._redo.append(step)
+        return len(step)
+
+    def redo(self):
+        """Makes the last undone step again. Returns how many changes it had."""
+        if not self._redo:
+            return 0
+        step = self._redo.pop()
+        self._run(reapply, step)
+        self._undo.append(step)
+        return len(step)
+
+    def _run(self, fn, step):
+        self._applying = True
+        try:
+            fn(self.store, step)
+        finally:
+            self._applying = False
+
+
+_REMOVED = object()
+
+
+class Transaction:
+    """A batch of changes staged over a store and applied together.
+
+        with Transaction(inventory) as txn:
+            txn.update("3", quantity=0)
+            txn.remove("4")
+        # committed here, or nothing changed if the block raised
+
+    Staging checks the same things the store would (duplicate ids,
+    missing items), so commit() only fails on errors from the store itself.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._overlay = {}  # id -> staged item, or _REMOVED
+        self._ops = []  # (op, id, item or changes), in order
+        self._next_id = int(store.new_id())
+
+    def __len__(self):
+        return len(self._ops)
+
+    def get(self, item_id):
+        item = self._overlay.get(item_id)
+        if item is None:
+            return self.store.get(item_id)
+        return None if item is _REMOVED else dict(item)
+
+    def __contains__(self, item_id):
+        return self.get(item_id) is not None
+
+    def new_id(self):
+        return str(self._next_id)
+
+    def add(self, item):
+        item_id = item["id"]
+        if item_id in self:
+            raise ValueError(f"duplicate item id {item_id!r}")
+        self._overlay[item_id] = dict(item)
+        self._ops.append(("add", item_id, dict(item)))
+        try:
+            self._next_id = max(self._next_id, int(item_id) + 1)
+        except ValueError:
+            pass
+        return item
+
+    def update(self, item_id, **changes):
+        current = self.get(item_id)
+        if current is None:
+            raise KeyError(item_id)
+        self._overlay[item_id] = dict(current, **changes)
+        self._ops.append(("update", item_id, changes))
+        return self._overlay[item_id]
+
+    def remove(self, item_id):
+        current = self.get(item_id)
+        if current is None:
+            raise KeyError(item_id)
+        self._overlay[item_id] = _REMOVED
+        self._ops.append(("remove", item_id, None))
+        return current
+
+    def commit(self):
+        """Applies every staged change, or none of them. Returns how many were applied."""
+        done = []
+        try:
+            for op, item_id, arg in self._ops:
+                if op == "add":
+                    self.store.add(dict(arg))
+                    done.append((op, item_id, None, arg))
+                elif op == "update":
+                    old = dict(self.store.get(item_id))
+                    self.store.update(item_id, **arg)
+                    done.append((op, item_id, old, dict(old, **arg)))
+                else:
+                    done.append((op, item_id, dict(self.store.remove(item_id)), None))
+        except BaseException:
+            revert(self.store, done)
+            raise
+        self.rollback()
+        return len(done)
+
+    def rollback(self):
+        """Drops every staged change."""
+        self._overlay.clear()
+        self._ops.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
@@ -0,0 +1,123 @@
+"""
+Item record and the field rules shared by the menu, the batch commands,
+the service and migrations.
+
+Stores keep items as plain dicts (they are what gets saved and sent to
+listeners). Item is the typed form an outside record is checked and
+converted through once, on its way in, so nothing downstream calls
+float() or int() on stored fields again.
+"""
+
+import math
+import re
+
+PRICE_ERROR = "Invalid price. Enter a number (e.g., 9.99)."
+QUANTITY_ERROR = "Invalid quantity. Enter an integer (e.g., 5)."
+# Line breaks and other control characters would split a CSV row over
+# several lines, which the parallel CSV reader cuts the file at
+_CONTROL = re.compile(r"[\x00-\x1f\x7f]")
+
+
+def parse_text(value, field):
+    """Returns value as a stripped string, or raises ValueError if it holds a control character."""
+    text = str(value or "").strip()
+    if _CONTROL.search(text):
+        raise ValueError(f"{field} cannot contain line breaks or other control characters")
+    return text
+
+
+def parse_name(value):
+    """Returns value as a stripped, non-empty name, or raises ValueError with a message for the user."""
+    name = parse_text(value, "name")
+    if not name:
+        raise ValueError("name cannot be empty")
+    return name
+
+
+def parse_price(value):
+    """Returns value as a finite non-negative float, or raises ValueError with a message for the user."""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(PRICE_ERROR) from None
+    if not math.isfinite(price):  # float() also accepts "nan" and "inf"
+        raise ValueError(PRICE_ERROR)
+    if price < 0:
+        raise ValueError("Price must be non-negative.")
+    return price
+
+
+def parse_quantity(value):
+    """Returns value as a non-negative int, or raises ValueError with a message for the user."""
+    # int() would quietly turn true into 1 and 2.9 into 2
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(QUANTITY_ERROR)
+    try:
+        quantity = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(QUANTITY_ERROR) from None
+    if quantity < 0:
+        raise ValueError("Quantity must be non-negative.")
+    return quantity
+
+
+class Item:
+    """One inventory item with price and quantity already converted."""
+
+    __slots__ = ("id", "name", "price", "quantity", "category")
+
+    def __init__(self, item_id, name, price, quantity, category=""):
+        self.id = item_id
+        self.name = name
+        self.price = price
+        self.quantity = quantity
+        self.category = category
+
+    @classmethod
+    def from_record(cls, rec):
+        """Checks and converts a raw record (e.g. a parsed CSV row or JSON object).
+
+        The id may be blank, for the caller to fill in. Raises ValueError
+        naming the first problem found.
+        """
+        if not isinstance(rec, dict):
+            raise ValueError("not an object")
+        name = parse_name(rec.get("name"))
+        return cls(parse_text(rec.get("id"), "id"), name,
+                   parse_price(rec.get("price")), parse_quantity(rec.get("quantity")),
+                   parse_text(rec.get("category"), "category"))
+
+    def as_dict(self):
+        """The dict stores keep, leaving out an empty category."""
+        item = {"id": self.id, "name": self.name, "price": self.price, "quantity": self.quantity}
+        if self.category:
+            item["category"] = self.category
+        return item
+
+    def __eq__(self, other):
+        if not isinstance(other, Item):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self):
+        return f"Item({self.id!r}, {self.name!r}, {self.price!r}, {self.quantity!r}, {self.category!r})"
+
+
+def check_records(records):
+    """Checks stored records the way imported ones are checked.
+
+    Every file format's load goes through this, so a hand-edited file
+    cannot put a negative quantity or an item without an ID into the
+    store. Bad records are skipped. Returns (item dicts, number skipped).
+    """
+    items = []
+    count = 0
+    for rec in records:
+        count += 1
+        try:
+            item = Item.from_record(rec)
+        except ValueError:
+            continue
+        if item.id:
+            items.append(item.as_dict())
+    return items, count - len(items)
@@ -0,0 +1,154 @@
+"""
+Append-only change journal for the inventory.
+
+Every add, update and remove is appended to the journal as one JSON line
+the moment it happens, and Save only appends a commit marker. The full
+data file (the snapshot) is rewritten only when the journal is compacted,
+so a save costs O(changes) instead of O(catalogue), and changes made
+before a crash can be recovered on the next start.
+
+Records are idempotent ("put" the whole item, or "del" an id), so
+replaying a journal over a snapshot that already contains some of its
+changes is harmless. That makes the compaction order safe: write the
+snapshot, then empty the journal.
+"""
+import json
+import os
+
+COMPACT_RECORDS = 10000  # compact once the journal holds this many records...
+COMPACT_RATIO = 0.5      # ...or more records than this fraction of the inventory
+
+
+def _apply(inventory, record):
+    if record["op"] == "put":
+        item = record["item"]
+        if item["id"] in inventory:
+            inventory.update(item["id"], **item)
+        else:
+            inventory.add(item)
+    elif record["op"] == "del":
+        if record["id"] in inventory:
+            inventory.remove(record["id"])
+
+
+class Journal:
+    """JSON-lines journal file. Use record() as an Inventory listener."""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = 0  # records since the last compaction
+        self._uncommitted = 0  # records since the last commit marker
+        self._committed = 0  # file size at the last commit marker
+        self._f = None
+
+    def replay(self, inventory):
+        """Applies committed records to inventory and returns the records
+        written after the last commit (changes that were never saved)."""
+        committed, pending, offset = self._read()
+        for r in committed:
+            _apply(inventory, r)
+        self._uncommitted = len(pending)
+        self._f = open(self.path, "ab")
+        self._f.truncate(offset)  # drop a torn last line, if any
+        return pending
+
+    def _read(self):
+        # Returns the committed records, the ones after the last commit
+        # and the size of the file up to the last whole line
+        committed, pending = [], []
+        offset = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn write at the end of the file
+                    offset += len(line)
+                    if record["op"] == "commit":
+                        committed.extend(pending)
+                        pending = []
+                        self._committed = offset
+                    else:
+                        pending.append(record)
+                        self.records += 1
+        return committed, pending, offset
+
+    def record(self, op, item_id, old, new):
+        if new is None:
+            rec = {"op": "del", "id": item_id}
+        else:
+            rec = {"op": "put", "item": new}
+        self._f.write(json.dumps(rec, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._f.flush()
+        self.records += 1
+        self._uncommitted += 1
+
+    def commit(self):
+        """Marks everything so far as saved and syncs it to disk."""
+        if not self._uncommitted:
+            return
+        self._f.write(b'{"op": "commit"}\n')
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._committed = os.fstat(self._f.fileno()).st_size
+        self._uncommitted = 0
+
+    def needs_compaction(self, size):
+        return self.records >= COMPACT_RECORDS or self.records > size * COMPACT_RATIO
+
+    def reset(self):
+        """Empties the journal once its changes are in a fresh snapshot."""
+        self._f.truncate(0)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.records = 0
+        self._uncommitted = 0
+        self._committed = 0
+
+    def discard_uncommitted(self):
+        """Drops changes made since the last commit (Exit without Saving)."""
+        self._f.truncate(self._committed)
+        self._f.flush()
+        self.records -= self._uncommitted
+        self._uncommitted = 0
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def open_journal(inventory, path, recover):
+    """Replays the journal at path onto inventory and starts recording into it.
+
+    recover(n) is asked whether to keep n changes that a previous session
+    made but never saved; they are dropped if it returns False.
+    """
+    journal = Journal(path)
+    pending = journal.replay(inventory)
+    if pending:
+        if recover(len(pending)):
+            for r in pending:
+                _apply(inventory, r)
+            journal.commit()
+        else:
+            journal.discard_uncommitted()
+    inventory.listeners.append(journal.record)
+    return journal
+
+
+def read_committed(load, path):
+    """Returns the inventory load() reads with the saved changes in the
+    journal at path applied, without opening the journal for writing.
+
+    For read-only sessions, which run alongside the one writing the
+    journal and so neither take its lock nor recover its unsaved changes.
+    """
+    # Journal first: if the writer compacts in between, the snapshot read
+    # next already has these changes, and replaying them again is harmless
+    committed, _, _ = Journal(path)._read()
+    inventory = load()
+    for r in committed:
+        _apply(inventory, r)
+    return inventory
@@ -0,0 +1,266 @@
+"""
+JSON-lines inventory file with a sidecar offset index, loaded lazily.
+
+The data file holds a header line {"next_id": N} and then one item per
+line. Next to it, PATH.idx holds (all
+little-endian):
+
+    header        magic b"INVIDX1\\0", item count n, next_id,
+                  longest name, data file size, data file mtime_ns
+    line offsets  n + 1 int64, byte offset of each line in the data file
+    id offsets    n + 1 int64, byte offsets into the id blob
+    id blob       UTF-8 ids, back to back
+
+Opening reads only the index, so the menu appears straight away whatever
+the inventory size. Single items are parsed from their line on demand and
+a background thread parses the rest into a full Inventory. Anything that
+needs the whole inventory (searches, reports, changes) waits for it.
+
+If the index is missing or does not match the data file (it records the
+file's size and mtime), open_jsonl parses the whole file instead, taking
+next_id from the header line so the IDs of removed items are not reused.
+"""
+import json
+import os
+import struct
+import threading
+from array import array
+
+from inventory.atomic import atomic_write
+from inventory.binary import little_endian
+from inventory.item import check_records
+from inventory.store import Inventory
+
+MAGIC = b"INVIDX1\0"
+HEADER = struct.Struct("<8sqqqqq")
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def _is_header(record):
+    # Files written before the header line start straight with an item
+    return "id" not in record and "next_id" in record
+
+
+def _checked(record):
+    # One record through the same check as the full load, None if it fails (or is the header)
+    items, _ = check_records([record])
+    return items[0] if items else None
+
+
+def write_jsonl(path, items, next_id):
+    """Atomically writes items to path, one per line after the header, and then its index."""
+    header = (json.dumps({"next_id": next_id}) + "\n").encode("utf-8")
+    line_offsets = array("q", [len(header)])
+    id_offsets = array("q", [0])
+    ids = []
+    longest = 0
+    end, id_end = len(header), 0
+    with atomic_write(path, "wb") as f:
+        f.write(header)
+        for item in items:
+            line = (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+            f.write(line)
+            end += len(line)
+            line_offsets.append(end)
+            b = str(item["id"]).encode("utf-8")
+            ids.append(b)
+            id_end += len(b)
+            id_offsets.append(id_end)
+            longest = max(longest, len(str(item.get("name", ""))))
+    st = os.stat(path)
+    with atomic_write(index_path(path), "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(ids), next_id, longest, st.st_size, st.st_mtime_ns))
+        f.write(little_endian(line_offsets).tobytes())
+        f.write(little_endian(id_offsets).tobytes())
+        f.write(b"".join(ids))
+
+
+def read_index(path):
+    """Returns (ids, line_offsets, next_id, longest_name), or None if the index is missing or stale."""
+    try:
+        with open(index_path(path), "rb") as f:
+            buf = f.read()
+        st = os.stat(path)
+    except OSError:
+        return None
+    if len(buf) < HEADER.size:
+        return None
+    magic, n, next_id, longest, size, mtime_ns = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or (size, mtime_ns) != (st.st_size, st.st_mtime_ns):
+        return None
+    start = HEADER.size
+    line_offsets = array("q")
+    line_offsets.frombytes(buf[start:start + 8 * (n + 1)])
+    id_offsets = array("q")
+    id_offsets.frombytes(buf[start + 8 * (n + 1):start + 16 * (n + 1)])
+    little_endian(line_offsets)
+    little_endian(id_offsets)
+    blob = buf[start + 16 * (n + 1):]
+    if blob.isascii():
+        text = blob.decode("ascii")
+        ids = [text[a:b] for a, b in zip(id_offsets, id_offsets[1:])]
+    else:
+        ids = [blob[a:b].decode("utf-8") for a, b in zip(id_offsets, id_offsets[1:])]
+    return ids, line_offsets, next_id, longest
+
+
+def parse_all(path, next_id=1):
+    """Parses the whole file into an Inventory."""
+    with open(path, "rb") as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    # One json.loads call for the whole file instead of one per line
+    items = json.loads(b"[" + b",".join(lines) + b"]")
+    if items and _is_header(items[0]):
+        next_id = max(next_id, int(items.pop(0)["next_id"]))
+    return Inventory.from_items(check_records(items)[0], next_id)
+
+
+def open_jsonl(path, warm=True):
+    """Opens path lazily through its index, or parses it in full if there is no usable index."""
+    index = read_index(path)
+    if index is None:
+        return parse_all(path)
+    return LazyInventory(path, *index, warm=warm)
+
+
+class LazyInventory:
+    """Inventory interface over a JSON-lines file, parsed on demand.
+
+    Until the background load finishes, len, membership, get, iteration
+    and max_name_length are answered from the index and single lines.
+    Everything else waits for the full Inventory and is passed on to it.
+    Lines that fail the record check are skipped by get and iteration as
+    by the full load, but still counted by len and membership until then.
+    """
+
+    def __init__(self, path, ids, line_offsets, next_id, longest, warm=True):
+        self.path = path
+        self._ids = ids
+        self._offsets = line_offsets
+        self._next_id = next_id
+        self._longest = longest
+        self._pos = None  # id -> line, built on first lookup
+        self._listeners = []
+        self._full = None
+        self._error = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._file = None
+        self._thread = None
+        if warm:
+            self._thread = threading.Thread(target=self._warm, name="inventory-warm-up", daemon=True)
+            self._thread.start()
+
+    def _warm(self):
+        try:
+            full = parse_all(self.path, self._next_id)
+        except Exception as e:
+            self._error = e
+        else:
+            with self._lock:
+                full.listeners = self._listeners
+                self._full = full
+        self._ready.set()
+
+    def wait(self):
+        """Returns the full Inventory, loading it now if the warm-up has not run."""
+        if self._full is None:
+            if self._thread is None:
+                self._warm()
+            self._ready.wait()
+            if self._error is not None:
+                raise RuntimeError(f"could not load {self.path}: {self._error}")
+        return self._full
+
+    # --- answered from the index while loading --------------------------
+
+    def __len__(self):
+        full = self._full
+        return len(self._ids) if full is None else len(full)
+
+    def _line(self, i):
+        # The item on line i, or None if the full load would skip it
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        self._file.seek(self._offsets[i])
+        return _checked(json.loads(self._file.read(self._offsets[i + 1] - self._offsets[i])))
+
+    def _row(self, item_id):
+        if self._pos is None:
+            # Reversed so the first of any duplicate ids wins, as in Inventory.from_items
+            self._pos = {item_id: i for i, item_id in reversed(list(enumerate(self._ids)))}
+        return self._pos.get(item_id)
+
+    def get(self, item_id):
+        full = self._full
+        if full is not None:
+            return full.get(item_id)
+        i = self._row(item_id)
+        return None if i is None else self._line(i)
+
+    def __contains__(self, item_id):
+        full = self._full
+        if full is not None:
+            return item_id in full
+        return self._row(item_id) is not None
+
+    def __iter__(self):
+        full = self._full
+        if full is not None:
+            return iter(full)
+        return self._stream()
+
+    def _stream(self):
+        # Lines in file order, skipping duplicate ids like the full load does
+        seen = set()
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    item = _checked(json.loads(line))
+                    if item is None:
+                        continue
+                    if item["id"] not in seen:
+                        seen.add(item["id"])
+                        yield item
+
+    def max_name_length(self):
+        full = self._full
+        return self._longest if full is None else full.max_name_length()
+
+    @property
+    def next_id(self):
+        full = self._full
+        return self._next_id if full is None else full.next_id
+
+    @next_id.setter
+    def next_id(self, value):
+        self.wait().next_id = value
+
+    def new_id(self):
+        return str(self.next_id)
+
+    @property
+    def listeners(self):
+        return self._listeners
+
+    @listeners.setter
+    def listeners(self, value):
+        with self._lock:
+            self._listeners = value
+            if self._full is not None:
+                self._full.listeners = value
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # --- everything else needs the full inventory -----------------------
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.wait(), name)
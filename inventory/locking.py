@@ -0,0 +1,58 @@
+"""
+Advisory file locks (fcntl.flock) for sessions sharing one data file.
+
+Locks are taken on a separate "<data file>.lock" file, because saves
+replace the data file itself with a rename. Only writers lock; readers
+never need to, since a rename swaps the whole file at once. Where fcntl
+is not available (Windows) the locks do nothing.
+"""
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # not on Windows
+    fcntl = None
+
+
+def try_lock(path):
+    """Takes an exclusive lock on path without waiting.
+
+    Returns an open file that holds the lock until it is closed, or None
+    if another process holds it.
+    """
+    f = open(path, "a")
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return None
+    return f
+
+
+def wait_lock(path, timeout, poll=0.05):
+    """Same as try_lock, but keeps trying for up to timeout seconds.
+
+    Saves wait here rather than blocking on the lock, since a journal
+    session holds it for as long as it runs.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        f = try_lock(path)
+        if f is not None or time.monotonic() >= deadline:
+            return f
+        time.sleep(poll)
+
+
+def file_stamp(path):
+    """Identity of the current version of path, None if it does not exist.
+
+    Every save renames a new file into place, so the inode changes even
+    when size and mtime happen to match.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
@@ -0,0 +1,106 @@
+"""
+Read-only queries straight from a memory-mapped binary snapshot.
+
+Opening only maps the file and reads its header, so start-up time does not
+depend on inventory size, and every reader process shares the same pages
+of the OS page cache. Rows are decoded only when they are returned.
+
+MappedInventory answers the same read queries as Inventory and ColumnStore,
+so view_stock, search_item, search_price and low_stock_report work on it.
+"""
+import mmap
+import sys
+from bisect import bisect_right
+
+from inventory.binary import Sections
+from inventory.columnar import RowQueries
+
+
+class MappedInventory(RowQueries):
+    """A binary snapshot (see inventory.binary) opened with mmap."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        sec = Sections(self._mm)
+        n = self._n = sec.count
+        self.next_id = sec.next_id
+        self._sec = sec
+        mv = self._mv = memoryview(self._mm)
+        if sys.byteorder == "little":
+            # Zero-copy views of the number columns
+            self.prices = mv[sec.prices:sec.prices + 8 * n].cast("d")
+            self.quantities = mv[sec.quantities:sec.quantities + 8 * n].cast("q")
+            self._id_offsets = mv[sec.id_offsets:sec.id_offsets + 8 * (n + 1)].cast("q")
+            self._name_offsets = mv[sec.name_offsets:sec.name_offsets + 8 * (n + 1)].cast("q")
+            if sec.category_offsets is not None:
+                self._cat_offsets = mv[sec.category_offsets:sec.category_offsets + 8 * (n + 1)].cast("q")
+        else:
+            self.prices = sec.array(self._mm, "d", sec.prices, n)
+            self.quantities = sec.array(self._mm, "q", sec.quantities, n)
+            self._id_offsets = sec.array(self._mm, "q", sec.id_offsets, n + 1)
+            self._name_offsets = sec.array(self._mm, "q", sec.name_offsets, n + 1)
+            if sec.category_offsets is not None:
+                self._cat_offsets = sec.array(self._mm, "q", sec.category_offsets, n + 1)
+        if sec.category_offsets is None:
+            self._cat_offsets = None
+
+    def close(self):
+        for view in (self.prices, self.quantities, self._id_offsets, self._name_offsets, self._cat_offsets):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mv.release()
+        self._mm.close()
+
+    def __len__(self):
+        return self._n
+
+    def _string(self, blob, offsets, i):
+        return self._mm[blob + offsets[i]:blob + offsets[i + 1]].decode("utf-8")
+
+    def id_at(self, i):
+        return self._string(self._sec.id_blob, self._id_offsets, i)
+
+    def name_at(self, i):
+        return self._string(self._sec.name_blob, self._name_offsets, i)
+
+    def item_at(self, i):
+        item = {"id": self.id_at(i), "name": self.name_at(i),
+                "price": self.prices[i], "quantity": self.quantities[i]}
+        if self._cat_offsets is not None and self._cat_offsets[i] != self._cat_offsets[i + 1]:
+            item["category"] = self._string(self._sec.category_blob, self._cat_offsets, i)
+        return item
+
+    def max_name_length(self):
+        # In bytes, which is never less than the length in characters
+        o = self._name_offsets
+        return max((o[i + 1] - o[i] for i in range(self._n)), default=0)
+
+    # --- queries -------------------------------------------------------
+
+    def search_name(self, term, prefix=False):
+        # Items whose name contains term (case-insensitive), in file order
+        term = term.lower()
+        if not term.isascii():
+            return [self.item_at(i) for i in range(self._n)
+                    if self._matches(self.name_at(i).lower(), term, prefix)]
+        # ASCII terms are found with bytes.find over the whole name blob
+        # (lowered in one C call), then mapped back to rows by offset.
+        start = self._sec.name_blob
+        blob = self._mm[start:start + self._name_offsets[self._n]].lower()
+        needle = term.encode("ascii")
+        offsets = self._name_offsets
+        rows = []
+        pos = blob.find(needle)
+        while pos != -1:
+            i = bisect_right(offsets, pos) - 1
+            if pos + len(needle) <= offsets[i + 1] and (not prefix or pos == offsets[i]):
+                rows.append(i)
+                pos = blob.find(needle, offsets[i + 1])
+            else:
+                pos = blob.find(needle, pos + 1)
+        return [self.item_at(i) for i in rows]
+
+    @staticmethod
+    def _matches(name, term, prefix):
+        return name.startswith(term) if prefix else term in name
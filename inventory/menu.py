@@ -0,0 +1,410 @@
+"""
+Interactive menu shared by both candidates.
+
+A candidate picks which commands its menu offers, in order, from COMMANDS
+(Candidate B has no price-range search, for example) and the numbering
+follows from that list. Every action works on whatever store the backend
+loaded, through the same query methods (get, search_name, price_range,
+below_quantity, ...), so there is one copy of each action for every
+format and backend.
+"""
+import math
+
+from inventory.aggregates import Aggregates
+from inventory.forecast import LEAD_DAYS, forecast, stockout_date
+from inventory.history import History, Transaction
+from inventory.item import parse_price, parse_quantity
+from inventory.stats import STATS, stats_menu
+from inventory.table import page_table
+
+
+def input_nonempty(prompt): # should ensure the input cannot be empty
+    while True:
+        s = input(prompt).strip()
+        if s:
+            return s
+        print("Input cannot be empty.")
+
+
+def input_field(prompt, parse, blank_ok=False):
+    """Asks until parse accepts the answer. With blank_ok, a blank answer returns None."""
+    while True:
+        s = input(prompt).strip()
+        if not s and blank_ok:
+            return None
+        try:
+            return parse(s)
+        except ValueError as e:
+            print(e)
+
+
+def ask_recover(count): # asked on start-up when the journal holds changes that were never saved
+    answer = input(f"Recover {count} unsaved changes from a previous session? (y/N): ").strip().lower()
+    return answer == 'y'
+
+
+# --- actions -----------------------------------------------------------
+
+def add_item(inventory): # Adding a new item to the inventory and validating both the price and quantity.
+    print("\nAdd Item")
+    print("Leave ID blank to auto-generate.")
+    raw_id = input("ID: ").strip()
+    if not raw_id:
+        item_id = inventory.new_id()
+    else:
+        if raw_id in inventory:
+            print("Error: An item with that ID already exists.")
+            return
+        item_id = raw_id
+
+    name = input_nonempty("Name: ")
+    price = input_field("Price: ", parse_price)
+    quantity = input_field("Quantity: ", parse_quantity)
+    category = input("Category (optional): ").strip()
+
+    item = {"id": item_id, "name": name, "price": price, "quantity": quantity}
+    if category:
+        item["category"] = category
+    inventory.add(item)
+    print(f"Added item {item_id} - {name}.")
+
+
+def view_stock(inventory): # This displays all inventory items in a table.
+    if not inventory:
+        print("\nInventory is empty.")
+        return
+    # Rows are produced and printed a page at a time rather than built up front
+    rows = ([it.get("id"), it.get("name"), f"{it.get('price'):.2f}", it.get("quantity")] for it in inventory)
+    print("\nCurrent Stock")
+    page_table(rows, ["ID", "Name", "Price", "Quantity"], widths=[0, inventory.max_name_length()])
+
+
+def update_item(inventory): # This updates an existing inventory item by ID
+    if not inventory:
+        print("\nInventory is empty.")
+        return
+    item_id = input_nonempty("Enter ID of item to update: ")
+    item = inventory.get(item_id)
+    if not item:
+        print("Item not found.")
+        return
+    print(f"Updating {item_id} - {item['name']}. Leave blank to keep current value.")
+    txn = Transaction(inventory) # the fields are applied together at the end, Ctrl+C part way changes nothing
+    new_name = input(f"Name [{item['name']}]: ").strip()
+    if new_name:
+        txn.update(item_id, name=new_name)
+    price = input_field(f"Price [{item['price']:.2f}]: ", parse_price, blank_ok=True)
+    if price is not None:
+        txn.update(item_id, price=price)
+    quantity = input_field(f"Quantity [{item['quantity']}]: ", parse_quantity, blank_ok=True)
+    if quantity is not None:
+        txn.update(item_id, quantity=quantity)
+    new_cat = input(f"Category [{item.get('category', '')}] (- to clear): ").strip()
+    if new_cat:
+        txn.update(item_id, category="" if new_cat == "-" else new_cat)
+    txn.commit()
+    print("Item updated.")
+
+
+def remove_item(inventory): # This removes an item from the inventory after confirmation
+    if not inventory:
+        print("\nInventory is empty.")
+        return
+    item_id = input_nonempty("Enter ID of item to remove: ")
+    item = inventory.get(item_id)
+    if not item:
+        print("Item not found.")
+        return
+    confirm = input(f"Confirm delete {item_id} - {item['name']}? (y/N): ").strip().lower()
+    if confirm == 'y':
+        inventory.remove(item_id)
+        print("Item removed.")
+    else:
+        print("Deletion cancelled.")
+
+
+def search_item(inventory): # This searches inventory items by name using a case-insensitive match
+    if not inventory:
+        print("\nInventory is empty.")
+        return
+    term = input_nonempty("Search term (name, case-insensitive substring): ").lower()
+    # Only items sharing the term's trigrams are checked, see inventory.name_index
+    results = [[it.get("id"), it.get("name"), f"{it.get('price'):.2f}", it.get("quantity")]
+               for it in inventory.search_name(term)]
+    if not results:
+        # Nothing contains the term, so offer the closest names instead (trigram similarity, see inventory.name_index)
+        close = [[it.get("id"), it.get("name"), f"{it.get('price'):.2f}", it.get("quantity"), f"{score:.0%}"]
+                 for it, score in inventory.search_fuzzy(term)]
+        if not close:
+            print("No matching items found.")
+            return
+        print(f"\nNo exact matches for '{term}'. Closest names:")
+        page_table(close, ["ID", "Name", "Price", "Quantity", "Match"])
+        return
+    print(f"\nSearch results for '{term}':")
+    page_table(results, ["ID", "Name", "Price", "Quantity"])
+
+
+def search_price(inventory):
+    if not inventory:
+        print("\nInventory is empty.")
+        return
+
+    while True:
+        try:
+            # 1. Convert inputs to floats immediately to allow for math comparisons
+            # (parse_price also turns away negatives, nan and inf)
+            p1 = parse_price(input_nonempty("Enter the lower price limit: "))
+            p2 = parse_price(input_nonempty("Enter the upper price limit: "))
+        except ValueError as e:
+            print(e)
+            continue
+        if p1 > p2:
+            print("The first price must be less than or equal to the second price.")
+            continue
+
+        # If all checks pass, store them
+        low, high = p1, p2
+        break
+
+    # 2. Ask the sorted price index for the band instead of checking every item
+    results = [[it.get("id"), it.get("name"), f"{it.get('price', 0):.2f}", it.get("quantity")]
+               for it in inventory.price_range(low, high)]
+
+    if not results:
+        print(f"\nNo matching items found between {low:.2f} and {high:.2f}.")
+        return
+
+    print(f"\nSearch results for items priced between {low:.2f} and {high:.2f}:")
+    page_table(results, ["ID", "Name", "Price", "Quantity"])
+
+
+def low_stock_report(inventory): # This generates a report of items below a specified quantity threshold.
+    if not inventory:
+        print("\nInventory is empty.")
+        return
+    while True:
+        t = input("Report threshold (items with quantity < threshold). Enter integer (default 5): ").strip()
+        if not t:
+            threshold = 5
+            break
+        try:
+            threshold = int(t)
+            break
+        except Exception:
+            print("Invalid number.")
+    # The quantity index hands back just the items under the threshold
+    low = [[it.get("id"), it.get("name"), it.get("quantity")] for it in inventory.below_quantity(threshold)]
+    if not low:
+        print(f"No items below {threshold}.")
+        return
+    print(f"\nLow-stock items (quantity < {threshold}):")
+    page_table(low, ["ID", "Name", "Quantity"])
+
+
+def valuation_report(totals): # stock value, price stats and a per-category rollup, from running totals
+    s = totals.summary()
+    if not s["count"]:
+        print("\nInventory is empty.")
+        return
+    print("\nValuation")
+    print(f"Items: {s['count']}  Units: {s['quantity']}  Total value: {s['value']:.2f}")
+    print(f"Price min {s['min_price']:.2f}  avg {s['avg_price']:.2f}  max {s['max_price']:.2f}")
+    rows = [[cat or "(none)", c["count"], c["quantity"], f"{c['value']:.2f}"]
+            for cat, c in sorted(totals.categories.items(), key=lambda kv: -kv[1]["value"])]
+    print("\nBy category:")
+    page_table(rows, ["Category", "Items", "Units", "Value"])
+
+
+def forecast_report(inventory, history): # items ranked by days until they run out at their recent rate of use
+    if history is None:
+        print("\nStock history is off (INVENTORY_STOCK_HISTORY=0), so there is nothing to forecast from.")
+        return
+    while True:
+        t = input(f"Reorder lead time in days (default {LEAD_DAYS}): ").strip()
+        if not t:
+            lead_days = LEAD_DAYS
+            break
+        try:
+            lead_days = float(t)
+            if math.isfinite(lead_days) and lead_days >= 0:
+                break
+            print("Lead time must be non-negative.")
+        except ValueError:
+            print("Invalid number.")
+    rows = [[f["id"], f["name"], f["quantity"], f"{f['rate']:.2f}", f"{f['days_left']:.1f}",
+             stockout_date(f), f["reorder_point"], "REORDER" if f["reorder"] else ""]
+            for f in forecast(history, inventory, lead_days)]
+    if not rows:
+        print("\nNo consumption recorded yet. Forecasts appear once quantities have gone down.")
+        return
+    print(f"\nStock-out forecast (lead time {lead_days:g} days), soonest first:")
+    page_table(rows, ["ID", "Name", "Quantity", "Per day", "Days left", "Runs out", "Reorder at", "Status"])
+
+
+# --- the menu loop -----------------------------------------------------
+
+class Session:
+    """One menu session: the backend, the store it loaded and this session's undo history.
+
+    Read-only stores cannot change, so they get no history.
+    """
+
+    def __init__(self, backend, inventory, read_only=False):
+        self.backend = backend
+        self.inventory = inventory
+        # undo/redo of this session's changes, see inventory.history
+        self.history = None if read_only else History.track(inventory)
+        self._totals = None
+
+    @property
+    def totals(self):
+        # Built on first use so a lazily loaded inventory is not parsed at start-up,
+        # then kept up to date on every change, see inventory.aggregates
+        if self._totals is None:
+            self._totals = Aggregates.track(self.inventory)
+        return self._totals
+
+    def unavailable(self):
+        # Menu entries with nothing to do right now, shown greyed out
+        if self.history is None:
+            return set()
+        return {key for key, ok in (("undo", self.history.can_undo()), ("redo", self.history.can_redo())) if not ok}
+
+
+def _action(name, fn):
+    # A menu entry that runs fn on the store, timed under name when stats are on
+    def run(session):
+        STATS.call(name, fn, session.inventory)
+    return run
+
+
+def save(session):
+    if STATS.call("save_data", session.backend.save, session.inventory, bytes_path=session.backend.path):
+        print("Saved.")
+
+
+def save_and_exit(session):
+    if STATS.call("save_data", session.backend.save, session.inventory, bytes_path=session.backend.path):
+        print("Saved. Exiting.")
+        return True
+
+
+def exit_without_saving(session):
+    confirm = input("Exit without saving? (y/N): ").strip().lower()
+    if confirm != 'y':
+        print("Cancelled.")
+        return False
+    if session.backend.autocommit:
+        print("Note: the database backend saves every change as it is made.")
+    session.backend.discard(session.inventory)
+    print("Exiting without saving.")
+    return True
+
+
+def valuation(session):
+    STATS.call("valuation_report", valuation_report, session.totals)
+
+
+def stock_forecast(session):
+    STATS.call("forecast_report", forecast_report, session.inventory, session.backend.stock_history)
+
+
+def undo_last(session): # reverts the last menu action that changed something
+    n = session.history.undo()
+    print(f"Undid {n} change(s)." if n else "Nothing to undo.")
+
+
+def redo_last(session):
+    n = session.history.redo()
+    print(f"Redid {n} change(s)." if n else "Nothing to redo.")
+
+
+# Menu entries: key -> (label, handler). A handler gets the Session and
+# returns True to leave the menu.
+COMMANDS = {
+    "add": ("Add Item", _action("add_item", add_item)),
+    "view": ("View Stock", _action("view_stock", view_stock)),
+    "update": ("Update Item", _action("update_item", update_item)),
+    "remove": ("Remove Item", _action("remove_item", remove_item)),
+    "search": ("Search by Name", _action("search_item", search_item)),
+    "price": ("Search by Price Range", _action("search_price", search_price)),
+    "low": ("Low-stock Report", _action("low_stock_report", low_stock_report)),
+    "save": ("Save", save),
+    "save_exit": ("Save & Exit", save_and_exit),
+    "exit": ("Exit without Saving", exit_without_saving),
+    "stats": ("Stats", lambda session: stats_menu(STATS)),
+    "valuation": ("Valuation Report", valuation),
+    "undo": ("Undo", undo_last),
+    "redo": ("Redo", redo_last),
+    "forecast": ("Stock-out Forecast", stock_forecast),
+}
+
+
+def print_menu(title, keys, unavailable=()):
+    print(f"\n{title}")
+    print("-" * len(title))
+    for n, key in enumerate(keys, 1):
+        label = COMMANDS[key][0]
+        print(f"{n}) {label} (nothing to {label.lower()})" if key in unavailable else f"{n}) {label}")
+
+
+def run(backend, title, keys):
+    """The main menu loop, offering the COMMANDS named in keys. Closes the backend when it ends."""
+    try:
+        _main_loop(backend, title, keys)
+    finally:
+        backend.close() # releases the journal and its lock
+
+
+def _main_loop(backend, title, keys):
+    try:
+        inventory = STATS.call("load_data", backend.load, bytes_path=backend.path)
+    except RuntimeError as e: # e.g. another journal-mode session holds the lock
+        print("Error:", e)
+        return
+    print("Loaded", len(inventory), "items.")
+    session = Session(backend, inventory)
+    while True:
+        try:
+            session.history.checkpoint() # each menu action is one undo step
+            print_menu(title, keys, session.unavailable())
+            choice = input(f"Choose an option (1-{len(keys)}): ").strip()
+            if not (choice.isdigit() and 1 <= int(choice) <= len(keys)):
+                print("Invalid choice.")
+            elif COMMANDS[keys[int(choice) - 1]][1](session):
+                break
+        except KeyboardInterrupt:
+            print("\nInterrupted. Use menu to save and exit or exit without saving.")
+        except Exception as e:
+            print("An error occurred:", e)
+
+
+def run_read_only(backend, title, keys):
+    """Menu loop with only query commands, answered from backend.open_read_only(). Closes the backend when it ends."""
+    try:
+        _read_only_loop(backend, title, keys)
+    finally:
+        backend.close()
+
+
+def _read_only_loop(backend, title, keys):
+    inventory = backend.open_read_only()
+    print("Opened", len(inventory), "items (read-only).")
+    session = Session(backend, inventory, read_only=True)
+    exit_choice = str(len(keys) + 1)
+    while True:
+        try:
+            print_menu(f"{title} (read-only)", keys)
+            print(f"{exit_choice}) Exit")
+            choice = input(f"Choose an option (1-{exit_choice}): ").strip()
+            if choice == exit_choice:
+                break
+            if not (choice.isdigit() and 1 <= int(choice) <= len(keys)):
+                print("Invalid choice.")
+            else:
+                COMMANDS[keys[int(choice) - 1]][1](session)
+        except KeyboardInterrupt:
+            print(f"\nInterrupted. Use option {exit_choice} to exit.")
+        except Exception as e:
+            print("An error occurred:", e)
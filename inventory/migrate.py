@@ -0,0 +1,89 @@
+"""
+Copies an inventory.json or inventory.csv into an SQLite database.
+
+    python -m inventory.migrate inventory.json inventory.db
+    python -m inventory.migrate inventory.csv inventory.db
+
+Items go in through one transaction, so a failed migration leaves the
+database as it was. IDs that already exist in the database are skipped.
+"""
+import argparse
+import json
+import os
+import sys
+
+from inventory.csv_rows import iter_items
+from inventory.item import Item
+from inventory.sqlite_store import SqliteInventory
+
+
+def read_source(path):
+    """Returns (items, next_id) from a JSON or CSV inventory file."""
+    if path.lower().endswith(".csv"):
+        next_id = 1
+        try:
+            # The CSV candidate keeps its ID high-water mark in a sidecar
+            with open(path + ".meta", "r", encoding="utf-8") as f:
+                next_id = int(json.load(f)["next_id"])
+        except (OSError, ValueError, KeyError):
+            pass
+        return list(iter_items(path)), next_id
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    next_id = 1
+    if isinstance(data, dict):
+        try:
+            next_id = int(data.get("next_id", 1))
+        except (TypeError, ValueError):
+            next_id = 1  # extend() still moves it past every numeric ID
+        data = data.get("items")
+    if not isinstance(data, list):
+        raise ValueError(f"{path} does not hold a list of items")
+    return data, next_id
+
+
+def migrate(source, db_path):
+    """Copies source into db_path and returns how many items were added."""
+    items, next_id = read_source(source)
+    store = SqliteInventory(db_path)
+    try:
+        seen = set()
+        new = []
+        for item in items:
+            item_id = str(item["id"])
+            if item_id in seen or item_id in store:
+                continue
+            seen.add(item_id)
+            try:
+                new.append(Item.from_record(dict(item, id=item_id)).as_dict())
+            except ValueError as e:
+                raise ValueError(f"item {item_id}: {e}") from None
+        store.extend(new)
+        # Keep the source's high-water mark so removed IDs stay retired
+        if next_id > 1:
+            with store.conn:
+                store._bump_next_id(next_id - 1)
+        return len(new)
+    finally:
+        store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inventory.migrate", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="inventory.json or inventory.csv")
+    parser.add_argument("database", help="SQLite file to create or add to")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.source):
+        print(f"Error: {args.source} not found.", file=sys.stderr)
+        return 1
+    try:
+        count = migrate(args.source, args.database)
+    except (OSError, ValueError, KeyError) as e:
+        print("Error:", e, file=sys.stderr)
+        return 1
+    print(f"Migrated {count} items into {args.database}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
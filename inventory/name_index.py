@@ -0,0 +1,186 @@
+"""
+Trigram index over lowercased item names for substring, prefix and fuzzy search.
+"""
+import heapq
+import math
+import os
+import pickle
+import re
+
+CACHE_VERSION = 4
+MIN_SCORE = 0.25  # default similarity cut-off for fuzzy search
+PAD = "\0"  # marks word boundaries in fuzzy trigrams, never part of a name
+_WORD = re.compile(r"\w+")
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def word_trigrams(text):
+    """Trigrams of each word padded like pg_trgm ("\\0\\0ab", "\\0ab", ..., "yz\\0").
+
+    The padding makes short words and first/last letters count, which is
+    what lets a misspelt name still share most of its trigrams.
+    """
+    return [trigrams(PAD * 2 + w + PAD) for w in _WORD.findall(text)]
+
+
+def _post(postings, grams, item_id):
+    for g in grams:
+        postings.setdefault(g, set()).add(item_id)
+
+
+def _unpost(postings, grams, item_id):
+    for g in grams:
+        ids = postings[g]
+        ids.discard(item_id)
+        if not ids:
+            del postings[g]
+
+
+def _jaccard(a, b):
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if shared else 0.0
+
+
+class NameIndex:
+    """Maps every 3-character slice of a lowercased name to the ids using it.
+
+    A search term of 3+ characters can only match names that contain all of
+    its trigrams, so only the ids in the smallest intersecting posting sets
+    are checked. Shorter terms fall back to a scan of the lowercased names,
+    which still saves calling lower() on every name per search.
+
+    similar() ranks misspelt names from a second set of postings, of
+    padded per-word trigrams. Neither set of postings is needed to load or
+    edit the inventory, so each is built on the first search that uses it
+    and kept up to date from then on, instead of slowing down every load.
+    """
+
+    def __init__(self):
+        self._lower = {}  # id -> lowercased name
+        self._grams = None  # trigram -> set of ids, built on first search() of 3+ characters
+        self._lengths = {}  # name length -> number of names that long
+        self._fuzzy = None  # padded word trigram -> set of ids, built on first similar()
+
+    @classmethod
+    def for_fuzzy(cls, pairs):
+        """An index over (id, name) pairs for similar() only."""
+        index = cls()
+        for item_id, name in pairs:
+            index._lower[item_id] = str(name).lower()
+        return index
+
+    def __len__(self):
+        return len(self._lower)
+
+    def add(self, item_id, name):
+        lower = str(name).lower()
+        self._lower[item_id] = lower
+        self._lengths[len(lower)] = self._lengths.get(len(lower), 0) + 1
+        if self._grams is not None:
+            _post(self._grams, trigrams(lower), item_id)
+        if self._fuzzy is not None:
+            _post(self._fuzzy, set().union(*word_trigrams(lower)), item_id)
+
+    def remove(self, item_id):
+        lower = self._lower.pop(item_id)
+        if self._lengths[len(lower)] == 1:
+            del self._lengths[len(lower)]
+        else:
+            self._lengths[len(lower)] -= 1
+        if self._grams is not None:
+            _unpost(self._grams, trigrams(lower), item_id)
+        if self._fuzzy is not None:
+            _unpost(self._fuzzy, set().union(*word_trigrams(lower)), item_id)
+
+    def rename(self, item_id, name):
+        self.remove(item_id)
+        self.add(item_id, name)
+
+    def max_length(self):
+        # There are few distinct name lengths, so this max is cheap
+        return max(self._lengths, default=0)
+
+    def search(self, term, prefix=False):
+        # ids whose name contains (or starts with) term, in no particular order
+        term = term.lower()
+        if len(term) < 3:
+            candidates = self._lower
+        else:
+            if self._grams is None:
+                self._grams = {}
+                for item_id, lower in self._lower.items():
+                    _post(self._grams, trigrams(lower), item_id)
+            postings = []
+            for g in trigrams(term):
+                ids = self._grams.get(g)
+                if not ids:
+                    return []
+                postings.append(ids)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        lower = self._lower
+        if prefix:
+            return [i for i in candidates if lower[i].startswith(term)]
+        return [i for i in candidates if term in lower[i]]
+
+    def similar(self, term, k=10, min_score=MIN_SCORE):
+        """Returns up to k (score, id) pairs for names similar to term, best first.
+
+        The score is the trigram Jaccard similarity of term with the whole
+        name or with its best matching word, whichever is higher. Only
+        names sharing enough of term's trigrams to reach min_score are
+        scored at all.
+        """
+        words = word_trigrams(term.lower())
+        q = set().union(*words)
+        if not q:
+            return []
+        # Any name scoring min_score shares at least `need` of q's trigrams,
+        # so it is in at least one of the len(q) - need + 1 shortest
+        # posting sets. The longer (more common) ones are never read.
+        need = max(1, math.ceil(min_score * len(q)))
+        if self._fuzzy is None:
+            self._fuzzy = {}
+            for item_id, lower in self._lower.items():
+                _post(self._fuzzy, set().union(*word_trigrams(lower)), item_id)
+        postings = sorted((self._fuzzy.get(g, ()) for g in q), key=len)
+        candidates = set().union(*postings[:len(q) - need + 1])
+        scored = []
+        for item_id in candidates:
+            name_words = word_trigrams(self._lower[item_id])
+            best = _jaccard(q, set().union(*name_words))
+            for grams in name_words:
+                best = max(best, _jaccard(q, grams))
+            if best >= min_score:
+                scored.append((best, item_id))
+        return heapq.nlargest(k, scored, key=lambda pair: pair[0])
+
+    # --- on-disk cache -------------------------------------------------
+    # The cache is stamped with the size and mtime of the data file it was
+    # built from, and is ignored if the data file has changed since. It
+    # holds the substring postings only if a search has built them.
+
+    def save(self, path, data_file):
+        st = os.stat(data_file)
+        with open(path, "wb") as f:
+            pickle.dump((CACHE_VERSION, st.st_size, st.st_mtime_ns, self._lower, self._grams, self._lengths), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, data_file):
+        # Returns None when there is no usable cache. Only load caches this
+        # program wrote itself: it is a pickle.
+        try:
+            st = os.stat(data_file)
+            with open(path, "rb") as f:
+                version, size, mtime_ns, *tables = pickle.load(f)
+        except Exception:
+            return None
+        if (version, size, mtime_ns) != (CACHE_VERSION, st.st_size, st.st_mtime_ns):
+            return None
+        index = cls()
+        index._lower, index._grams, index._lengths = tables
+        return index
@@ -0,0 +1,22 @@
+"""
+Optional dependencies, imported on first use.
+
+NumPy speeds up the column scans and the report maths (aggregates,
+columns, mapped, forecast), but every one of them has a plain-Python
+fallback. Importing it costs more than the rest of start-up put together,
+so it is only imported the first time a vectorised path asks for it:
+batch commands and menu sessions that never reach one never pay for it.
+"""
+_numpy = False  # False until the import has been tried, then the module or None
+
+
+def numpy():
+    """The numpy module, or None if it is not installed."""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy = np
+    return _numpy
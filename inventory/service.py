@@ -0,0 +1,349 @@
+"""
+Local HTTP/JSON inventory service.
+
+One warm process keeps the inventory and its indexes in memory and
+answers many clients (tills, dashboards) without each of them re-reading
+the data file. Changes are saved in batches by a background task instead
+of on every request.
+
+    python -m inventory.service --candidate json --port 8080
+
+    GET    /items?offset=0&limit=100        list items
+    GET    /items/<id>                      one item
+    POST   /items                           add {"name", "price", "quantity", optional "id", "category"}
+    PATCH  /items/<id>                      change any of name, price, quantity, category
+    DELETE /items/<id>                      remove
+    GET    /search?name=<term>&prefix=1     name search
+    GET    /search?name=<term>&fuzzy=1      names similar to term, best first, with a match score
+    GET    /search?min_price=1&max_price=5  price range
+    GET    /reports/low-stock?threshold=5   low-stock report
+    GET    /reports/valuation               stock value, price stats and category rollup
+    GET    /reports/valuation?verify=1      the same, checking the running totals against a full recompute
+    GET    /reports/forecast?lead_days=7    items ranked by days until they run out
+    POST   /save                            save now
+
+The storage mode comes from the candidate script and its environment
+variables (INVENTORY_BACKEND, INVENTORY_JOURNAL, ...), as in the menu.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import math
+from itertools import islice
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from inventory.aggregates import Aggregates
+from inventory.cli import refuse_recover, validate_records
+from inventory.forecast import LEAD_DAYS, forecast
+from inventory.item import parse_name, parse_price, parse_quantity, parse_text
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY = 1024 * 1024
+
+log = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(query, key, kind, default=None, minimum=None):
+    if key not in query:
+        if default is None:
+            raise HTTPError(400, f"missing query parameter {key}")
+        return default
+    try:
+        value = kind(query[key][0])
+    except ValueError:
+        raise HTTPError(400, f"bad value for {key}") from None
+    if not math.isfinite(value) or (minimum is not None and value < minimum):
+        raise HTTPError(400, f"bad value for {key}")
+    return value
+
+
+def _json_body(body):
+    if not body:
+        return {}
+    try:
+        body = json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "body is not valid JSON") from None
+    if not isinstance(body, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return body
+
+
+async def _read_head(reader):
+    # The request line and headers, or None when the client is done
+    line = await reader.readline()
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        return None
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _content_length(headers):
+    text = headers.get("content-length") or "0"
+    if not text.isdigit():  # also refuses negatives
+        raise HTTPError(400, "bad Content-Length")
+    length = int(text)
+    if length > MAX_BODY:
+        raise HTTPError(413, "body too large")
+    return length
+
+
+def _on_loop(loop, fn):
+    # Called from a worker thread: runs fn() on loop and waits for its result
+    async def run():
+        return fn()
+    return asyncio.run_coroutine_threadsafe(run(), loop).result()
+
+
+async def _respond(writer, status, payload, keep_alive):
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data)
+    await writer.drain()
+
+
+class InventoryService:
+    """Serves one backend's inventory over HTTP."""
+
+    def __init__(self, backend, flush_interval=2.0):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.inventory = backend.load()
+        self.dirty = False
+        self.inventory.listeners.append(self._changed)
+        self.totals = Aggregates.track(self.inventory)
+        # Changes wait while a save is running, reads do not
+        self._write_lock = asyncio.Lock()
+        self._server = None
+        self._flusher = None
+        # path -> {method: handler}; /items/<id> is routed separately
+        self._routes = {
+            ("items",): {"GET": self._list, "POST": self._add},
+            ("search",): {"GET": self._search},
+            ("reports", "low-stock"): {"GET": self._low_stock},
+            ("reports", "forecast"): {"GET": self._forecast},
+            ("reports", "valuation"): {"GET": self._valuation},
+            ("save",): {"POST": self._save},
+        }
+        self._item_routes = {"GET": self._item, "PATCH": self._update, "DELETE": self._remove}
+
+    def _changed(self, op, item_id, old, new):
+        self.dirty = True
+
+    # --- saving ----------------------------------------------------------
+
+    async def flush(self):
+        async with self._write_lock:
+            if not self.dirty:
+                return True
+            self.dirty = False
+            loop = asyncio.get_running_loop()
+            # The save runs in a worker thread, but changes it merges in from
+            # other sessions are made on the loop, between requests, so no
+            # read ever sees the store half-way through one
+            self.backend.run_changes = lambda fn: _on_loop(loop, fn)
+            ok = await loop.run_in_executor(None, self.backend.save, self.inventory)
+            if not ok:
+                self.dirty = True
+            return ok
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    # --- server ----------------------------------------------------------
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """Starts listening; port 0 picks a free port. Returns the bound port."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self._flusher = asyncio.create_task(self._flush_loop())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.flush()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await _read_head(reader)
+                if request is None:
+                    break
+                method, target, version, headers = request
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    length = _content_length(headers)
+                except HTTPError as e:
+                    # The body cannot be skipped reliably, so the connection ends here
+                    status, payload, keep_alive = e.status, {"error": str(e)}, False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(method, target, body)
+                await _respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        try:
+            if len(parts) == 2 and parts[0] == "items":
+                routes, args = self._item_routes, parts[1:]
+            else:
+                routes, args = self._routes.get(tuple(parts)), []
+            if routes is None:
+                raise HTTPError(404, "no such resource")
+            handler = routes.get(method)
+            if handler is None:
+                raise HTTPError(405, f"{method} not allowed here")
+            return await handler(parse_qs(url.query), _json_body(body), *args)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except Exception:
+            # A bug, not the client's fault: log it and keep serving
+            log.exception("%s %s failed", method, target)
+            return 500, {"error": "internal error"}
+
+    # --- routes ------------------------------------------------------------
+    # Each handler takes the parsed query and JSON body (plus the item id
+    # for /items/<id>) and returns (status, payload) or raises HTTPError.
+
+    async def _list(self, query, body):
+        offset = _number(query, "offset", int, 0, minimum=0)
+        limit = _number(query, "limit", int, 100, minimum=0)
+        return 200, {"total": len(self.inventory), "items": list(islice(self.inventory, offset, offset + limit))}
+
+    async def _search(self, query, body):
+        if "name" in query and query.get("fuzzy") == ["1"]:
+            items = [dict(it, match=score) for it, score in
+                     self.inventory.search_fuzzy(query["name"][0], _number(query, "top", int, 10, minimum=0))]
+        elif "name" in query:
+            items = self.inventory.search_name(query["name"][0], query.get("prefix") == ["1"])
+            if "min_price" in query or "max_price" in query:
+                low = _number(query, "min_price", float, 0.0)
+                high = _number(query, "max_price", float, float("inf"))
+                items = [it for it in items if low <= it["price"] <= high]
+        else:
+            items = self.inventory.price_range(_number(query, "min_price", float),
+                                               _number(query, "max_price", float))
+        return 200, {"items": items}
+
+    async def _low_stock(self, query, body):
+        threshold = _number(query, "threshold", int, 5)
+        return 200, {"threshold": threshold, "items": self.inventory.below_quantity(threshold)}
+
+    async def _forecast(self, query, body):
+        if self.backend.stock_history is None:
+            raise HTTPError(404, "stock history is off")
+        lead_days = _number(query, "lead_days", float, LEAD_DAYS, minimum=0)
+        return 200, {"lead_days": lead_days, "items": forecast(self.backend.stock_history, self.inventory, lead_days)}
+
+    async def _valuation(self, query, body):
+        report = dict(self.totals.summary(), categories=self.totals.categories)
+        if query.get("verify") == ["1"]:
+            report["problems"] = self.totals.verify()
+            for problem in report["problems"]:
+                log.warning("running totals are off: %s", problem)
+        return 200, report
+
+    async def _save(self, query, body):
+        if not await self.flush():
+            raise HTTPError(500, "save failed")
+        return 200, {"saved": True}
+
+    def _get(self, item_id):
+        item = self.inventory.get(item_id)
+        if item is None:
+            raise HTTPError(404, "item not found")
+        return item
+
+    async def _item(self, query, body, item_id):
+        return 200, self._get(item_id)
+
+    async def _add(self, query, body):
+        async with self._write_lock:
+            items, errors = validate_records([body], self.inventory)
+            if errors:
+                status = 409 if "already exists" in errors[0] else 400
+                raise HTTPError(status, errors[0].replace("record 1: ", ""))
+            return 201, self.inventory.add(items[0])
+
+    async def _remove(self, query, body, item_id):
+        async with self._write_lock:
+            self._get(item_id)
+            return 200, self.inventory.remove(item_id)
+
+    async def _update(self, query, body, item_id):
+        changes = {k: body[k] for k in ("name", "price", "quantity", "category") if k in body}
+        try:
+            if "name" in changes:
+                changes["name"] = parse_name(changes["name"])
+            if "price" in changes:
+                changes["price"] = parse_price(changes["price"])
+            if "quantity" in changes:
+                changes["quantity"] = parse_quantity(changes["quantity"])
+            if "category" in changes:
+                changes["category"] = parse_text(changes["category"], "category")
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+        async with self._write_lock:
+            self._get(item_id)
+            return 200, self.inventory.update(item_id, **changes)
+
+
+async def serve(backend, host, port, flush_interval):
+    service = InventoryService(backend, flush_interval)
+    port = await service.start(host, port)
+    print(f"Serving {len(service.inventory)} items on http://{host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+        backend.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inventory.service", description="Local HTTP/JSON inventory service.")
+    parser.add_argument("--candidate", choices=("json", "csv"), default="json",
+                        help="which candidate script's storage settings to use")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--flush-interval", type=float, default=2.0, help="seconds between background saves")
+    args = parser.parse_args(argv)
+    app = importlib.import_module("Inventory_Code_json" if args.candidate == "json" else "Inventory_Code_csv")
+    try:
+        asyncio.run(serve(app.make_backend(refuse_recover), args.host, args.port, args.flush_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
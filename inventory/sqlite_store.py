@@ -0,0 +1,233 @@
+"""
+SQLite storage backend (standard library sqlite3).
+
+SqliteInventory has the same interface as Inventory but keeps nothing in
+memory: lookups, searches, price-range and low-stock queries run as SQL
+against indexed columns, and every add, update and remove is its own
+transaction. There is no load-everything/save-everything step.
+"""
+import sqlite3
+
+from inventory.backends import StorageBackend
+from inventory.locking import wait_lock
+from inventory.name_index import MIN_SCORE, NameIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    price REAL NOT NULL,
+    quantity INTEGER NOT NULL,
+    category TEXT
+);
+CREATE INDEX IF NOT EXISTS items_name ON items (name_lower);
+CREATE INDEX IF NOT EXISTS items_price ON items (price);
+CREATE INDEX IF NOT EXISTS items_quantity ON items (quantity);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+FIELDS = ("id", "name", "price", "quantity", "category")
+_SELECT = "SELECT id, name, price, quantity, category FROM items "
+_INSERT = "INSERT INTO items (id, name, name_lower, price, quantity, category) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+def _item(row):
+    item = dict(zip(FIELDS, row))
+    if not item["category"]:
+        del item["category"]  # category is optional, the same as in the other stores
+    return item
+
+
+def _row(item):
+    return (item["id"], item["name"], str(item["name"]).lower(), item["price"], item["quantity"],
+            item.get("category") or None)
+
+
+def _int_id(item_id):
+    try:
+        return int(item_id)
+    except (TypeError, ValueError):
+        return None
+
+
+class SqliteInventory:
+    """Inventory interface over an SQLite database."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(items)")]
+        if "category" not in columns:  # databases made before categories existed
+            with self.conn:
+                self.conn.execute("ALTER TABLE items ADD COLUMN category TEXT")
+        self.listeners = []  # same contract as Inventory.listeners
+        self._names = None  # fuzzy search index, built on first search_fuzzy() and then kept in sync
+
+    def close(self):
+        self.conn.close()
+
+    # --- ids -------------------------------------------------------------
+
+    @property
+    def next_id(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        return row[0] if row else 1
+
+    def _bump_next_id(self, item_id):
+        n = _int_id(item_id)
+        if n is not None:
+            self.conn.execute(
+                "INSERT INTO meta VALUES ('next_id', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = max(value, excluded.value)", (n + 1,))
+
+    def new_id(self):
+        return str(self.next_id)
+
+    # --- reads -----------------------------------------------------------
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def __iter__(self):
+        # A separate cursor, so callers can page through while changing items
+        for row in self.conn.execute(_SELECT + "ORDER BY rowid"):
+            yield _item(row)
+
+    def __contains__(self, item_id):
+        return self.conn.execute("SELECT 1 FROM items WHERE id = ?", (item_id,)).fetchone() is not None
+
+    def get(self, item_id):
+        row = self.conn.execute(_SELECT + "WHERE id = ?", (item_id,)).fetchone()
+        return None if row is None else _item(row)
+
+    def price_range(self, low, high):
+        return [_item(r) for r in self.conn.execute(
+            _SELECT + "WHERE price BETWEEN ? AND ? ORDER BY price, id", (low, high))]
+
+    def below_quantity(self, threshold):
+        return [_item(r) for r in self.conn.execute(
+            _SELECT + "WHERE quantity < ? ORDER BY quantity, id", (threshold,))]
+
+    def search_name(self, term, prefix=False):
+        # name_lower is lowercased by Python, so matching agrees with the
+        # other stores for non-ASCII names too
+        term = term.lower()
+        if prefix:
+            # A range on the indexed column instead of LIKE, which would
+            # need case_sensitive_like to use the index
+            rows = self.conn.execute(_SELECT + "WHERE name_lower >= ? AND name_lower < ? ORDER BY rowid",
+                                     (term, term + "\U0010ffff"))
+        else:
+            rows = self.conn.execute(_SELECT + "WHERE instr(name_lower, ?) > 0 ORDER BY rowid", (term,))
+        return [_item(r) for r in rows]
+
+    def search_fuzzy(self, term, k=10, min_score=MIN_SCORE):
+        # SQLite has no trigram similarity, so names are indexed in memory
+        # the first time this is asked and kept up to date from then on
+        if self._names is None:
+            self._names = NameIndex()
+            for item_id, name in self.conn.execute("SELECT id, name FROM items"):
+                self._names.add(item_id, name)
+        return [(self.get(i), score) for score, i in self._names.similar(term, k, min_score)]
+
+    def price_bounds(self):
+        # Both ends come from the price index
+        return tuple(self.conn.execute("SELECT MIN(price), MAX(price) FROM items").fetchone())
+
+    def max_name_length(self):
+        return self.conn.execute("SELECT COALESCE(MAX(length(name)), 0) FROM items").fetchone()[0]
+
+    # --- changes, one transaction each -----------------------------------
+
+    def _notify(self, op, item_id, old, new):
+        for fn in self.listeners:
+            fn(op, item_id, old, new)
+
+    def add(self, item):
+        item_id = item["id"]
+        with self.conn:
+            try:
+                self.conn.execute(_INSERT, _row(item))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"duplicate item id {item_id!r}") from None
+            self._bump_next_id(item_id)
+        if self._names is not None:
+            self._names.add(item_id, item["name"])
+        self._notify("add", item_id, None, dict(item))
+        return item
+
+    def extend(self, items):
+        # One transaction for the whole batch
+        items = list(items)
+        with self.conn:
+            self.conn.executemany(_INSERT, [_row(it) for it in items])
+            top = max((n for n in map(_int_id, (it["id"] for it in items)) if n is not None), default=None)
+            if top is not None:
+                self._bump_next_id(top)
+        if self._names is not None:
+            for it in items:
+                self._names.add(it["id"], it["name"])
+        for it in items:
+            self._notify("add", it["id"], None, dict(it))
+
+    def update(self, item_id, **changes):
+        old = self.get(item_id)
+        if old is None:
+            raise KeyError(item_id)
+        new = dict(old, **changes)
+        with self.conn:
+            self.conn.execute("UPDATE items SET name = ?, name_lower = ?, price = ?, quantity = ?, category = ? "
+                              "WHERE id = ?", _row(new)[1:] + (item_id,))
+        if self._names is not None and new["name"] != old["name"]:
+            self._names.rename(item_id, new["name"])
+        self._notify("update", item_id, old, dict(new))
+        return new
+
+    def remove(self, item_id):
+        old = self.get(item_id)
+        if old is None:
+            raise KeyError(item_id)
+        with self.conn:
+            self.conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+        if self._names is not None:
+            self._names.remove(item_id)
+        self._notify("remove", item_id, old, None)
+        return old
+
+
+class SqliteBackend(StorageBackend):
+    autocommit = True
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._store = None
+
+    def load(self):
+        if self._store is None:
+            self._store = SqliteInventory(self.path)
+            self._store.listeners.extend(self.listeners)
+        return self._store
+
+    def save(self, inventory):
+        return self._saved()  # every change is already committed
+
+    def _saved(self):
+        # SQLite serialises the items, but not the files the hooks save next
+        # to the database (the stock history), so those take turns here
+        lock = wait_lock(self.path + ".lock", self.lock_timeout)
+        if lock is None:
+            print("Warning: another session is saving, so the stock history was not saved this time.")
+            return True
+        with lock:
+            return super()._saved()
+
+    def discard(self, inventory):
+        # The changes are in the database anyway, so whatever follows them is kept too
+        self._saved()
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+            self._store = None
@@ -0,0 +1,146 @@
+"""
+Opt-in timing and profiling for menu sessions.
+
+Set INVENTORY_STATS=1 to turn it on. Every menu action and every load and
+save is then counted and timed into a latency histogram, along with the
+bytes of the data file read or written. The Stats menu entry shows the
+numbers and can start/stop cProfile or take a tracemalloc snapshot. At
+exit everything is written as JSON to INVENTORY_STATS_FILE (default
+inventory_stats.json).
+
+When stats are off, Stats.call just calls the function.
+"""
+import atexit
+import json
+import os
+import time
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+PROFILE_FILE = "inventory_profile.prof"
+MEMORY_FILE = "inventory_memory.txt"
+
+
+def _bucket(ms):
+    for bound in BUCKETS_MS:
+        if ms <= bound:
+            return "inf" if bound == float("inf") else f"<={bound}ms"
+
+
+class Stats:
+    def __init__(self, enabled=False, dump_path=None):
+        self.enabled = enabled
+        self.dump_path = dump_path
+        self.ops = {}
+        self._profiler = None
+
+    @classmethod
+    def from_env(cls):
+        stats = cls(os.environ.get("INVENTORY_STATS") == "1",
+                    os.environ.get("INVENTORY_STATS_FILE", "inventory_stats.json"))
+        if stats.enabled:
+            atexit.register(stats.dump)
+        return stats
+
+    def call(self, name, fn, *args, bytes_path=None, **kwargs):
+        """Calls fn(*args, **kwargs), timing it under name when enabled.
+
+        bytes_path is a file whose size after the call counts as the
+        bytes read or written by it.
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        error = True
+        try:
+            result = fn(*args, **kwargs)
+            error = False
+            return result
+        finally:
+            size = 0
+            if bytes_path:
+                try:
+                    size = os.path.getsize(bytes_path)
+                except OSError:
+                    pass
+            self.record(name, time.perf_counter() - start, size, error)
+
+    def record(self, name, seconds, nbytes=0, error=False):
+        op = self.ops.get(name)
+        if op is None:
+            op = self.ops[name] = {"calls": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0,
+                                   "bytes": 0, "histogram": {}}
+        op["calls"] += 1
+        op["errors"] += error
+        op["total_s"] += seconds
+        op["max_s"] = max(op["max_s"], seconds)
+        op["bytes"] += nbytes
+        b = _bucket(seconds * 1000)
+        op["histogram"][b] = op["histogram"].get(b, 0) + 1
+
+    def as_dict(self):
+        return {"pid": os.getpid(), "time": time.time(), "ops": self.ops}
+
+    def dump(self, path=None):
+        path = path or self.dump_path
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        return path
+
+    def report(self):
+        if not self.ops:
+            return "No operations recorded yet."
+        lines = [f"{'operation':22} {'calls':>6} {'avg ms':>9} {'max ms':>9} {'bytes':>12}"]
+        for name, op in sorted(self.ops.items(), key=lambda kv: -kv[1]["total_s"]):
+            avg = op["total_s"] / op["calls"] * 1000
+            lines.append(f"{name:22} {op['calls']:>6} {avg:>9.2f} {op['max_s'] * 1000:>9.2f} {op['bytes']:>12}")
+        return "\n".join(lines)
+
+    def toggle_profiler(self, path=PROFILE_FILE):
+        """Starts cProfile, or stops it and writes the profile to path."""
+        import cProfile
+
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            return "Profiler started."
+        self._profiler.disable()
+        self._profiler.dump_stats(path)
+        self._profiler = None
+        return f"Profiler stopped, profile written to {path} (read it with python -m pstats)."
+
+    def memory_snapshot(self, path=MEMORY_FILE, top=20):
+        """Writes the top allocation sites to path. The first call only starts tracing."""
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            return "tracemalloc started, take another snapshot later to see allocations."
+        stats = tracemalloc.take_snapshot().statistics("lineno")[:top]
+        with open(path, "w", encoding="utf-8") as f:
+            for s in stats:
+                f.write(f"{s}\n")
+        return f"Top {len(stats)} allocation sites written to {path}."
+
+
+def stats_menu(stats, ask=input):
+    """The Stats menu entry."""
+    if not stats.enabled:
+        print("Stats are off. Start with INVENTORY_STATS=1 to record them.")
+        return
+    while True:
+        print("\nSession Stats")
+        print(stats.report())
+        print("\np) Start/stop cProfile  m) tracemalloc snapshot  d) Dump JSON now  (Enter to go back)")
+        choice = ask("Choice: ").strip().lower()
+        if choice == "p":
+            print(stats.toggle_profiler())
+        elif choice == "m":
+            print(stats.memory_snapshot())
+        elif choice == "d":
+            print("Written to", stats.dump())
+        else:
+            return
+
+
+STATS = Stats.from_env()
@@ -0,0 +1,242 @@
+"""
+In-memory inventory container used by both candidates.
+"""
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+
+from inventory.name_index import MIN_SCORE, NameIndex
+
+_key = itemgetter(0)
+
+
+class SortedIndex:
+    """Sorted list of (value, id) pairs kept up to date with bisect.
+
+    Inserts and removals are a binary search plus a list memmove, and range
+    queries cost O(log n + k) for k matches.
+    """
+
+    def __init__(self, pairs=()):
+        self._pairs = sorted(pairs)
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def insert(self, value, item_id):
+        insort(self._pairs, (value, item_id))
+
+    def extend(self, pairs):
+        # Timsort merges the new run into the sorted list in ~linear time
+        self._pairs.extend(pairs)
+        self._pairs.sort()
+
+    def remove(self, value, item_id):
+        i = bisect_left(self._pairs, (value, item_id))
+        if i == len(self._pairs) or self._pairs[i] != (value, item_id):
+            # Deleting whatever sits at i would silently drop another item from the index
+            raise KeyError((value, item_id))
+        del self._pairs[i]
+
+    def between(self, low, high):
+        # ids with low <= value <= high, in value order
+        lo = bisect_left(self._pairs, low, key=_key)
+        hi = bisect_right(self._pairs, high, key=_key)
+        return [item_id for _, item_id in self._pairs[lo:hi]]
+
+    def below(self, high):
+        # ids with value < high, in value order
+        hi = bisect_left(self._pairs, high, key=_key)
+        return [item_id for _, item_id in self._pairs[:hi]]
+
+    def bounds(self):
+        # (smallest, largest) value, or (None, None) when empty
+        if not self._pairs:
+            return None, None
+        return self._pairs[0][0], self._pairs[-1][0]
+
+
+class Inventory:
+    """Ordered list of item dicts with an id -> position index kept in sync.
+
+    Lookups, duplicate checks and removals are O(1). Removed items leave a
+    hole in the list which is compacted once holes make up half of it, so
+    the display order of the remaining items never changes.
+    """
+
+    # Fields with a SortedIndex, and the value used when an item lacks one
+    SORTED_FIELDS = {"price": 0, "quantity": 0}
+
+    def __init__(self, next_id=1):
+        self._items = []  # items in insertion order, None marks a removed slot
+        self._pos = {}    # id -> index into self._items
+        self._holes = 0
+        self._sorted = {field: SortedIndex() for field in self.SORTED_FIELDS}
+        self.names = NameIndex()
+        # Called as fn(op, item_id, old, new) after every change, where op is
+        # "add", "update" or "remove" and old/new are copies of the item
+        # (None for the side that does not exist).
+        self.listeners = []
+        # High-water mark for numeric ids. It only ever grows, so ids of
+        # removed items are not handed out again.
+        self.next_id = next_id
+
+    @classmethod
+    def from_items(cls, items, next_id=1, names=None):
+        # Build from loaded data. Later duplicates of an id are dropped, which
+        # matches the old find_by_id behaviour of returning the first match.
+        # names is an already built NameIndex, e.g. from the on-disk cache.
+        inv = cls(next_id)
+        for item in items:
+            item_id = item.get("id")
+            if item_id not in inv._pos:
+                inv._pos[item_id] = len(inv._items)
+                inv._items.append(item)
+                inv._bump_next_id(item_id)
+        # One sort per index instead of an insort per item
+        for field, default in cls.SORTED_FIELDS.items():
+            inv._sorted[field] = SortedIndex((it.get(field, default), it["id"]) for it in inv._items)
+        if names is not None and len(names) == len(inv):
+            inv.names = names
+        else:
+            for it in inv._items:
+                inv.names.add(it["id"], it.get("name", ""))
+        return inv
+
+    def __len__(self):
+        return len(self._pos)
+
+    def __iter__(self):
+        for item in self._items:
+            if item is not None:
+                yield item
+
+    def __contains__(self, item_id):
+        return item_id in self._pos
+
+    def get(self, item_id):
+        i = self._pos.get(item_id)
+        return None if i is None else self._items[i]
+
+    def add(self, item):
+        item_id = item["id"]
+        if item_id in self._pos:
+            raise ValueError(f"duplicate item id {item_id!r}")
+        self._pos[item_id] = len(self._items)
+        self._items.append(item)
+        for field, default in self.SORTED_FIELDS.items():
+            self._sorted[field].insert(item.get(field, default), item_id)
+        self.names.add(item_id, item.get("name", ""))
+        self._bump_next_id(item_id)
+        self._notify("add", item_id, None, item)
+        return item
+
+    def extend(self, items):
+        # Bulk add of items whose ids are already known to be new. Big
+        # batches update the sorted indexes with one sort each instead of
+        # an insort per item.
+        items = list(items)
+        if len(items) < 1000:
+            for item in items:
+                self.add(item)
+            return
+        for item in items:
+            item_id = item["id"]
+            if item_id in self._pos:
+                raise ValueError(f"duplicate item id {item_id!r}")
+            self._pos[item_id] = len(self._items)
+            self._items.append(item)
+            self.names.add(item_id, item.get("name", ""))
+            self._bump_next_id(item_id)
+        for field, default in self.SORTED_FIELDS.items():
+            self._sorted[field].extend((it.get(field, default), it["id"]) for it in items)
+        for item in items:
+            self._notify("add", item["id"], None, item)
+
+    def _bump_next_id(self, item_id):
+        try:
+            n = int(item_id)
+        except (TypeError, ValueError):
+            return
+        if n >= self.next_id:
+            self.next_id = n + 1
+
+    def new_id(self):
+        # add() keeps next_id above every numeric id seen, so this is free
+        return str(self.next_id)
+
+    def update(self, item_id, **changes):
+        return self._change(item_id, changes)
+
+    def replace(self, item):
+        """Makes the stored item with item's id equal to item, dropping fields item does not have."""
+        stored = self._items[self._pos[item["id"]]]
+        return self._change(item["id"], item, [k for k in stored if k not in item])
+
+    def _change(self, item_id, changes, drop=()):
+        # All field changes go through here so indexes can follow them.
+        item = self._items[self._pos[item_id]]
+        old = dict(item) if self.listeners else None
+        for field, default in self.SORTED_FIELDS.items():
+            if field in changes or field in drop:
+                self._sorted[field].remove(item.get(field, default), item_id)
+                self._sorted[field].insert(changes.get(field, default), item_id)
+        if "name" in changes or "name" in drop:
+            self.names.rename(item_id, changes.get("name", ""))
+        item.update(changes)
+        for field in drop:
+            del item[field]
+        self._notify("update", item_id, old, item)
+        return item
+
+    def remove(self, item_id):
+        i = self._pos.pop(item_id)
+        item = self._items[i]
+        self._items[i] = None
+        for field, default in self.SORTED_FIELDS.items():
+            self._sorted[field].remove(item.get(field, default), item_id)
+        self.names.remove(item_id)
+        self._holes += 1
+        if self._holes > 32 and self._holes * 2 > len(self._items):
+            self._compact()
+        self._notify("remove", item_id, item, None)
+        return item
+
+    def _notify(self, op, item_id, old, new):
+        if self.listeners:
+            new = None if new is None else dict(new)
+            for fn in self.listeners:
+                fn(op, item_id, old, new)
+
+    def _lookup(self, ids):
+        return [self._items[self._pos[i]] for i in ids]
+
+    def price_range(self, low, high):
+        # Items with low <= price <= high, cheapest first
+        return self._lookup(self._sorted["price"].between(low, high))
+
+    def below_quantity(self, threshold):
+        # Items with quantity < threshold, lowest stock first
+        return self._lookup(self._sorted["quantity"].below(threshold))
+
+    def price_bounds(self):
+        # (cheapest, dearest) price straight from the ends of the price index
+        return self._sorted["price"].bounds()
+
+    def max_name_length(self):
+        # Kept up to date by the name index, used to size table columns
+        return self.names.max_length()
+
+    def search_name(self, term, prefix=False):
+        # Items whose name contains term (case-insensitive), in inventory order
+        ids = self.names.search(term, prefix)
+        ids.sort(key=self._pos.__getitem__)
+        return self._lookup(ids)
+
+    def search_fuzzy(self, term, k=10, min_score=MIN_SCORE):
+        # Up to k (item, score) pairs with names similar to term, best first
+        return [(self._items[self._pos[i]], score) for score, i in self.names.similar(term, k, min_score)]
+
+    def _compact(self):
+        self._items = [it for it in self._items if it is not None]
+        self._pos = {it["id"]: i for i, it in enumerate(self._items)}
+        self._holes = 0
@@ -0,0 +1,75 @@
+"""
+Table output for the menu and the batch commands.
+
+write_table and page_table stream rows: column widths come from a sample of the first rows (or from widths the caller already
+knows, such as the longest name in the inventory) and rows are written in
+chunks as they are produced, so listing a huge catalogue never builds the
+whole output in memory.
+"""
+import sys
+from itertools import chain, islice
+
+PAGE_SIZE = 50      # rows per page in the menu
+SAMPLE_ROWS = 1000  # rows looked at to size the columns
+CHUNK_ROWS = 500    # rows per write() call
+
+
+def column_widths(headers, rows, widths=None):
+    """Widest cell per column over headers and rows, at least widths if given."""
+    out = [len(str(h)) for h in headers]
+    for i, w in enumerate(widths or ()):
+        out[i] = max(out[i], w or 0)
+    for r in rows:
+        for i, c in enumerate(r):
+            n = len(str(c))
+            if n > out[i]:
+                out[i] = n
+    return out
+
+
+def _head(headers, widths):
+    return (" | ".join(str(h).ljust(w) for h, w in zip(headers, widths)) + "\n"
+            + "-+-".join("-" * w for w in widths) + "\n")
+
+
+def _line(row, widths):
+    return " | ".join(str(c).ljust(w) for c, w in zip(row, widths)) + "\n"
+
+
+def write_table(rows, headers, out=None, widths=None, sample=SAMPLE_ROWS):
+    """Writes rows (any iterable) as a table to out, stdout by default.
+
+    Returns the widths used. Cells longer than a sampled width push their
+    row out of line rather than being cut off.
+    """
+    out = out or sys.stdout
+    rows = iter(rows)
+    first = list(islice(rows, sample))
+    widths = column_widths(headers, first, widths)
+    out.write(_head(headers, widths))
+    rows = chain(first, rows)
+    while True:
+        chunk = list(islice(rows, CHUNK_ROWS))
+        if not chunk:
+            break
+        out.write("".join(_line(r, widths) for r in chunk))
+    return widths
+
+
+def page_table(rows, headers, widths=None, page_size=PAGE_SIZE, ask=input):
+    """Shows rows a page at a time, asking before each further page.
+
+    Columns keep the widths worked out for the first page so the pages
+    line up. Returns the number of rows shown.
+    """
+    rows = iter(rows)
+    page = list(islice(rows, page_size))
+    widths = column_widths(headers, page, widths)
+    shown = 0
+    while page:
+        write_table(page, headers, widths=widths)
+        shown += len(page)
+        page = list(islice(rows, page_size))
+        if page and ask(f"-- {shown} shown. Enter for more, q to stop: ").strip().lower() == "q":
+            break
+    return shown
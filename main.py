@@ -1,10 +1,26 @@
-# main.py
 """
 	This File is the main program. This will be the final output.
+
+	python main.py                 menu, Candidate A settings (inventory.json)
+	python main.py --csv           menu, Candidate B settings (inventory.csv)
+	python main.py [--csv] add --name Pen --price 1.20 --quantity 40
+	                               batch commands, see inventory.cli
 """
+import sys
+
 
-# inventory management system
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # inventory management system
+    if argv[:1] == ["--csv"]:
+        import Inventory_Code_csv as app
+        argv = argv[1:]
+    else:
+        import Inventory_Code_json as app
+    if not argv:
+        print("Welcome to the Inventory Management System")
+    app.main(argv)
 
-print("Welcome to the Inventory Management System")
-inventory = ["book", 2, "pen", 3, "notebook", 2]
 
+if __name__ == "__main__":
+    main()
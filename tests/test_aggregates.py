@@ -0,0 +1,38 @@
+from inventory.aggregates import Aggregates
+from inventory.store import Inventory
+
+
+def _inventory():
+    return Inventory.from_items([
+        {"id": "1", "name": "Pen", "price": 1.5, "quantity": 10, "category": "Office"},
+        {"id": "2", "name": "Hammer", "price": 12.0, "quantity": 2, "category": "Tools"},
+        {"id": "3", "name": "Glue", "price": 3.0, "quantity": 4},
+    ])
+
+
+def test_running_totals_follow_changes_including_category_moves():
+    inventory = _inventory()
+    totals = Aggregates.track(inventory)
+    inventory.update("1", category="Tools", quantity=6)
+    inventory.update("2", category="")
+    inventory.update("3", category="Office", price=2.5)
+    inventory.add({"id": "4", "name": "Tape", "price": 2.0, "quantity": 1, "category": "Office"})
+    inventory.remove("4")
+    assert totals.verify() == []
+    assert totals.categories == {
+        "Tools": {"count": 1, "quantity": 6, "value": 9.0},
+        "": {"count": 1, "quantity": 2, "value": 24.0},
+        "Office": {"count": 1, "quantity": 4, "value": 10.0},
+    }
+    assert totals.summary() == {"count": 3, "quantity": 12, "value": 43.0,
+                                "min_price": 1.5, "max_price": 12.0, "avg_price": 16.0 / 3}
+
+
+def test_verify_reports_totals_that_drifted():
+    inventory = _inventory()
+    totals = Aggregates.track(inventory)
+    inventory.listeners.remove(totals.apply)
+    inventory.update("2", category="Office")  # missed by the totals
+    problems = totals.verify()
+    assert "category 'Office' count: running 1, recomputed 2" in problems
+    assert "category 'Tools' count: running 1, recomputed 0" in problems
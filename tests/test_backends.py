@@ -0,0 +1,107 @@
+from inventory.backends import FileBackend
+from inventory.formats import JsonFormat
+from inventory.locking import try_lock
+from inventory.store import Inventory
+
+
+def _backend(tmp_path):
+    fmt = JsonFormat(str(tmp_path / "inventory.json"))
+    return FileBackend(fmt.load, fmt.save, fmt.path)
+
+
+def _item(item_id, name, quantity=5):
+    return {"id": item_id, "name": name, "price": 1.0, "quantity": quantity}
+
+
+def _on_disk(tmp_path):
+    return {it["id"]: it for it in _backend(tmp_path).load()}
+
+
+def _two_sessions(tmp_path, *items):
+    setup = _backend(tmp_path)
+    inventory = setup.load()
+    for item in items:
+        inventory.add(item)
+    assert setup.save(inventory)
+    a, b = _backend(tmp_path), _backend(tmp_path)
+    return a, a.load(), b, b.load()
+
+
+def test_changes_to_different_items_are_merged(tmp_path):
+    a, inv_a, b, inv_b = _two_sessions(tmp_path, _item("1", "Pen"), _item("2", "Pencil"))
+    inv_a.update("1", quantity=1)
+    assert a.save(inv_a)
+    inv_b.update("2", quantity=2)
+    assert b.save(inv_b)
+    assert b.conflicts == [] and b.renumbered == {}
+    disk = _on_disk(tmp_path)
+    assert disk["1"]["quantity"] == 1 and disk["2"]["quantity"] == 2
+    assert inv_b.get("1")["quantity"] == 1  # the other session's change is merged in
+
+
+def test_the_other_sessions_change_wins_a_conflict(tmp_path, capsys):
+    a, inv_a, b, inv_b = _two_sessions(tmp_path, _item("1", "Pen"))
+    inv_a.update("1", quantity=1)
+    assert a.save(inv_a)
+    inv_b.update("1", quantity=9)
+    assert b.save(inv_b)
+    assert b.conflicts == ["1"]
+    assert _on_disk(tmp_path)["1"]["quantity"] == 1
+    assert "Kept their version of: 1" in capsys.readouterr().out
+
+
+def test_items_added_under_the_same_id_are_both_kept(tmp_path, capsys):
+    a, inv_a, b, inv_b = _two_sessions(tmp_path, _item("1", "Pen"))
+    inv_a.add(_item(inv_a.new_id(), "Ruler"))
+    assert a.save(inv_a)
+    inv_b.add(_item(inv_b.new_id(), "Stapler"))
+    assert b.save(inv_b)
+    assert b.conflicts == []
+    assert b.renumbered == {"2": "3"}
+    assert {k: v["name"] for k, v in _on_disk(tmp_path).items()} == {"1": "Pen", "2": "Ruler", "3": "Stapler"}
+    assert "renumbered: 2 -> 3" in capsys.readouterr().out
+    assert inv_b.new_id() == "4"
+
+
+def test_removal_is_merged(tmp_path):
+    a, inv_a, b, inv_b = _two_sessions(tmp_path, _item("1", "Pen"), _item("2", "Pencil"))
+    inv_a.remove("1")
+    assert a.save(inv_a)
+    inv_b.update("2", name="HB pencil")
+    assert b.save(inv_b)
+    assert sorted(_on_disk(tmp_path)) == ["2"]
+    assert "1" not in inv_b
+
+
+def test_a_cleared_category_stays_cleared(tmp_path):
+    a, inv_a, b, inv_b = _two_sessions(tmp_path, dict(_item("1", "Pen"), category="Office"), _item("2", "Pencil"))
+    inv_a.update("1", category="")
+    assert a.save(inv_a)
+    inv_b.update("2", quantity=2)
+    assert b.save(inv_b)
+    assert b.conflicts == []
+    assert not inv_b.get("1").get("category")
+    assert "category" not in _on_disk(tmp_path)["1"]
+
+
+def test_save_gives_up_while_another_session_holds_the_lock(tmp_path, capsys):
+    backend = _backend(tmp_path)
+    backend.lock_timeout = 0.1
+    inventory = backend.load()
+    inventory.add(_item("1", "Pen"))
+    held = try_lock(backend.path + ".lock")
+    try:
+        assert not backend.save(inventory)
+        assert "another session holds the lock" in capsys.readouterr().out
+    finally:
+        held.close()
+    assert backend.save(inventory)
+    assert sorted(_on_disk(tmp_path)) == ["1"]
+
+
+def test_replace_keeps_the_indexes_in_step_with_dropped_fields():
+    inventory = Inventory.from_items([dict(_item("1", "Pen"), category="Office")])
+    inventory.replace({"id": "1", "name": "Pen", "price": 2.0})
+    assert inventory.get("1") == {"id": "1", "name": "Pen", "price": 2.0}
+    assert inventory.below_quantity(1) == [inventory.get("1")]  # a missing quantity sorts as 0
+    assert inventory.price_bounds() == (2.0, 2.0)
@@ -0,0 +1,82 @@
+import os
+import stat
+
+import pytest
+
+from inventory.atomic import atomic_write
+from inventory.binary import read_snapshot, write_snapshot
+from inventory.formats import BinaryFormat, JsonFormat
+from inventory.store import Inventory
+
+ITEMS = [
+    {"id": "1", "name": "Pen", "price": 1.2, "quantity": 40},
+    {"id": "2", "name": "Crème brûlée torch", "price": 24.99, "quantity": 0, "category": "Kitchen"},
+    {"id": "A-7", "name": "", "price": 0.0, "quantity": 2 ** 40},
+]
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "inventory.bin")
+    write_snapshot(path, ITEMS, 9)
+    assert read_snapshot(path) == (ITEMS, 9)
+
+
+def test_snapshot_without_categories(tmp_path):
+    path = str(tmp_path / "inventory.bin")
+    items = [{k: v for k, v in it.items() if k != "category"} for it in ITEMS]
+    write_snapshot(path, items, 3)
+    assert read_snapshot(path) == (items, 3)
+
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / "inventory.bin")
+    write_snapshot(path, [], 1)
+    assert read_snapshot(path) == ([], 1)
+
+
+def test_binary_format_imports_its_source_until_the_first_save(tmp_path):
+    source = JsonFormat(str(tmp_path / "inventory.json"))
+    source.save(Inventory.from_items(ITEMS[:1], 5))
+    fmt = BinaryFormat(str(tmp_path / "inventory.bin"), source)
+    inventory = fmt.load()
+    assert list(inventory) == ITEMS[:1]
+    inventory.add(dict(ITEMS[1]))
+    assert fmt.save(inventory)
+    loaded = fmt.load()
+    assert list(loaded) == ITEMS[:2]
+    assert loaded.next_id == 5
+
+
+def test_atomic_write_leaves_the_old_file_on_error(tmp_path):
+    path = str(tmp_path / "data.txt")
+    with atomic_write(path) as f:
+        f.write("old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write("new")
+            raise RuntimeError("crash mid-save")
+    with open(path) as f:
+        assert f.read() == "old"
+    assert os.listdir(tmp_path) == ["data.txt"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fchmod"), reason="file modes are POSIX only")
+def test_atomic_write_keeps_the_file_mode(tmp_path):
+    path = str(tmp_path / "data.txt")
+    with atomic_write(path) as f:
+        f.write("one")
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
+    os.chmod(path, 0o640)
+    with atomic_write(path) as f:
+        f.write("two")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_load_skips_items_that_fail_the_record_check(tmp_path, capsys):
+    path = str(tmp_path / "inventory.bin")
+    write_snapshot(path, ITEMS + [{"id": "9", "name": "Glue", "price": 1.0, "quantity": -3}], 10)
+    inventory = BinaryFormat(path, JsonFormat(str(tmp_path / "inventory.json"))).load()
+    assert [it["id"] for it in inventory] == ["1", "2"]  # A-7 has no name, 9 a negative quantity
+    assert "skipped 2 items" in capsys.readouterr().out
@@ -0,0 +1,61 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from inventory import export as export_module
+from inventory.aggregates import recompute
+from inventory.export import export, low_stock, valuation
+
+ITEMS = [
+    {"id": str(i), "name": f"Item {i}", "price": 1.0 + i, "quantity": q, **({"category": "Office"} if i % 2 else {})}
+    for i, q in enumerate([5, 1, 3, 1, 0, 7, 3])
+]
+
+
+@pytest.fixture(params=[1, 2], ids=["in-process", "pooled"])
+def workers(request, monkeypatch):
+    # Tiny shards, and a pool even for a handful of items, so shard joins are exercised
+    monkeypatch.setattr(export_module, "SHARD_ROWS", 2)
+    monkeypatch.setattr(export_module, "PARALLEL_MIN_ROWS", 0)
+    return request.param
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_json_export_joins_shards_into_one_array(tmp_path, workers, compress):
+    path = tmp_path / "out.json"
+    export(str(path), ITEMS, "json", compress, workers, len(ITEMS))
+    data = path.read_bytes()
+    if compress:
+        assert data.count(b"\x1f\x8b") > 4  # one gzip member per shard and separator
+        data = gzip.decompress(data)
+    assert json.loads(data) == ITEMS
+
+
+def test_csv_and_jsonl_exports_keep_row_order(tmp_path, workers):
+    export(str(tmp_path / "out.csv.gz"), ITEMS, "csv", True, workers, len(ITEMS))
+    with gzip.open(tmp_path / "out.csv.gz", "rt", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["id"] for r in rows] == [it["id"] for it in ITEMS]
+    export(str(tmp_path / "out.jsonl"), ITEMS, "jsonl", False, workers, len(ITEMS))
+    lines = (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == ITEMS
+
+
+def test_empty_json_export_is_an_empty_array(tmp_path, workers):
+    export(str(tmp_path / "out.json"), [], "json", False, workers, 0)
+    assert json.loads((tmp_path / "out.json").read_text(encoding="utf-8")) == []
+
+
+def test_low_stock_merges_shards_lowest_first_with_ties_in_inventory_order(workers):
+    result = low_stock(ITEMS, 4, workers, len(ITEMS))
+    assert [(it["id"], it["quantity"]) for it in result] == [("4", 0), ("1", 1), ("3", 1), ("2", 3), ("6", 3)]
+
+
+def test_valuation_matches_a_full_recompute(workers):
+    totals = valuation(ITEMS, workers, len(ITEMS))
+    fresh = recompute(ITEMS)
+    assert totals["categories"] == fresh["categories"]
+    assert {k: v for k, v in totals.items() if k != "categories"} == pytest.approx(
+        {k: v for k, v in fresh.items() if k != "categories"})
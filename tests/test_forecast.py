@@ -0,0 +1,95 @@
+import pytest
+
+from inventory import forecast as forecast_module
+from inventory.forecast import DAY, StockHistory, _Series, forecast
+from inventory.store import Inventory
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_series_ring_drops_the_oldest_reading_and_its_consumption():
+    series = _Series(3)
+    for t, q in [(1, 10), (2, 7), (3, 9), (4, 5)]:
+        series.push(t, q)
+    # (1, 10) fell out, and with it the drop of 3 to the next reading; the restock to 9 never counted
+    assert series.readings() == [(2, 7), (3, 9), (4, 5)]
+    assert series.consumed == 4
+    assert series.oldest() == 2
+    series.push(5, 5)
+    series.push(6, 1)
+    assert series.readings() == [(4, 5), (5, 5), (6, 1)]
+    assert series.consumed == 4
+
+
+def test_history_records_quantity_changes_only():
+    clock = Clock(100.0)
+    history = StockHistory(samples=4, clock=clock)
+    history("add", "1", None, {"id": "1", "quantity": 5})
+    clock.now = 200.0
+    history("update", "1", {"quantity": 5}, {"quantity": 5, "name": "Pen"})
+    history("update", "1", {"quantity": 5}, {"quantity": 3})
+    history("update", "2", {"quantity": 8}, {"quantity": 6})
+    assert history.readings("1") == [(100.0, 5), (200.0, 3)]
+    assert history.readings("2") == [(100.0, 8), (200.0, 6)]  # the old quantity is dated from the start
+    history("remove", "2", {"quantity": 6}, None)
+    assert history.readings("2") == [] and len(history) == 1
+
+
+def test_save_merges_what_another_session_saved(tmp_path):
+    path = str(tmp_path / "inventory.json.history")
+    a = StockHistory(path, samples=3, clock=Clock(10.0), started=0.0)
+    b = StockHistory(path, samples=3, clock=Clock(20.0), started=5.0)
+    a("update", "1", {"quantity": 9}, {"quantity": 8})
+    a("update", "2", {"quantity": 4}, {"quantity": 3})
+    b("update", "1", {"quantity": 8}, {"quantity": 6})
+    b("remove", "2", {"quantity": 3}, None)
+    a.save()
+    b.save()
+    loaded = StockHistory.load(path)
+    # The latest three of both sessions' readings; b removed item 2, so a's readings of it are dropped
+    assert loaded.readings("1") == [(5.0, 8), (10.0, 8), (20.0, 6)]
+    assert loaded.readings("2") == []
+    assert (loaded.samples, loaded.started) == (3, 0.0)
+    # Saving again merges the file's readings with the same ones held in memory without doubling them
+    b.save()
+    assert StockHistory.load(path).readings("1") == loaded.readings("1")
+
+
+def test_an_unreadable_history_starts_afresh(tmp_path):
+    path = tmp_path / "inventory.json.history"
+    path.write_bytes(b"not a history")
+    assert len(StockHistory.load(str(path))) == 0
+
+
+@pytest.mark.parametrize("with_numpy", [True, False])
+def test_forecast_ranks_items_by_days_left(monkeypatch, with_numpy):
+    if with_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(forecast_module, "numpy", lambda: None)
+    store = Inventory.from_items([
+        {"id": "1", "name": "Pen", "price": 1.0, "quantity": 20},
+        {"id": "2", "name": "Glue", "price": 1.0, "quantity": 4},
+        {"id": "3", "name": "Tape", "price": 1.0, "quantity": 9},
+        {"id": "4", "name": "Clip", "price": 1.0, "quantity": 50},
+    ])
+    clock = Clock(0.0)
+    history = StockHistory(clock=clock, started=0.0)
+    clock.now = 2 * DAY
+    history("update", "1", {"quantity": 40}, {"quantity": 20})  # 10 a day, 2 days left
+    history("update", "2", {"quantity": 6}, {"quantity": 4})  # 1 a day, 4 days left
+    history("update", "3", {"quantity": 1}, {"quantity": 9})  # restocked only, no consumption
+    history("update", "4", {"quantity": 60}, {"quantity": 50})  # 5 a day, 10 days left
+    result = forecast(history, store, lead_days=3)
+    assert [e["id"] for e in result] == ["1", "2", "4"]
+    assert [e["rate"] for e in result] == [10.0, 1.0, 5.0]
+    assert [e["days_left"] for e in result] == [2.0, 4.0, 10.0]
+    assert [e["reorder_point"] for e in result] == [30, 3, 15]
+    assert [e["reorder"] for e in result] == [True, False, False]
+    assert result[0]["stockout"] == 4 * DAY
@@ -0,0 +1,17 @@
+from inventory.formats import CsvFormat
+
+
+def test_csv_load_skips_rows_that_fail_the_record_check(tmp_path):
+    path = tmp_path / "inventory.csv"
+    path.write_text(
+        "id,name,price,quantity,category\n"
+        "1, Pen ,1.5,3, Office \n"
+        "2,Glue,1.0,-3,\n"
+        ",Tape,2.0,1,\n"
+        "4,,2.0,1,\n"
+        "5,Ruler,-1,1,\n"
+        "6,Clip,nan,1,\n",
+        encoding="utf-8")
+    fmt = CsvFormat(str(path))
+    assert list(fmt.load()) == [{"id": "1", "name": "Pen", "price": 1.5, "quantity": 3, "category": "Office"}]
+    assert len(fmt.open_read_only()) == 1
@@ -0,0 +1,109 @@
+import pytest
+
+from inventory.history import History, Transaction
+from inventory.store import Inventory
+
+
+def _inventory():
+    return Inventory.from_items([
+        {"id": "1", "name": "Pen", "price": 1.0, "quantity": 10},
+        {"id": "2", "name": "Pencil", "price": 0.5, "quantity": 4},
+    ], 3)
+
+
+def _snapshot(store):
+    return [dict(it) for it in store]
+
+
+def test_undo_and_redo_one_step_at_a_time():
+    inventory = _inventory()
+    history = History.track(inventory)
+    start = _snapshot(inventory)
+    assert not history.can_undo() and not history.can_redo()
+
+    inventory.update("1", quantity=7)
+    inventory.remove("2")
+    history.checkpoint()
+    after_first = _snapshot(inventory)
+    inventory.add({"id": "3", "name": "Ruler", "price": 2.0, "quantity": 1})
+    assert history.can_undo()
+
+    assert history.undo() == 1
+    assert _snapshot(inventory) == after_first
+    assert history.undo() == 2
+    assert _snapshot(inventory) == start
+    assert history.undo() == 0
+    assert history.can_redo() and not history.can_undo()
+
+    assert history.redo() == 2
+    assert _snapshot(inventory) == after_first
+    assert history.redo() == 1
+    assert [it["id"] for it in inventory] == ["1", "3"]
+    assert history.redo() == 0
+
+
+def test_a_new_change_clears_redo():
+    inventory = _inventory()
+    history = History.track(inventory)
+    inventory.update("1", quantity=0)
+    history.undo()
+    assert history.can_redo()
+    inventory.update("2", quantity=0)
+    assert not history.can_redo()
+    assert history.redo() == 0
+
+
+def test_undo_keeps_the_indexes_in_step():
+    inventory = _inventory()
+    history = History.track(inventory)
+    inventory.update("1", price=9.0, name="Fountain pen")
+    history.undo()
+    assert [it["id"] for it in inventory.price_range(0.9, 1.1)] == ["1"]
+    assert inventory.price_range(8.0, 10.0) == []
+    assert inventory.search_name("fountain") == []
+
+
+def test_transaction_commits_all_changes_at_the_end():
+    inventory = _inventory()
+    with Transaction(inventory) as txn:
+        txn.update("1", quantity=1)
+        txn.remove("2")
+        txn.add({"id": txn.new_id(), "name": "Ruler", "price": 2.0, "quantity": 1})
+        assert inventory.get("1")["quantity"] == 10  # nothing applied yet
+        assert txn.get("1")["quantity"] == 1 and "2" not in txn
+    assert [(it["id"], it["quantity"]) for it in inventory] == [("1", 1), ("3", 1)]
+
+
+def test_transaction_is_dropped_when_the_block_raises():
+    inventory = _inventory()
+    start = _snapshot(inventory)
+    with pytest.raises(RuntimeError):
+        with Transaction(inventory) as txn:
+            txn.update("1", quantity=1)
+            txn.remove("2")
+            raise RuntimeError("cancelled")
+    assert _snapshot(inventory) == start
+
+
+def test_staging_refuses_what_the_store_would():
+    txn = Transaction(_inventory())
+    with pytest.raises(ValueError):
+        txn.add({"id": "1", "name": "Duplicate", "price": 1.0, "quantity": 1})
+    txn.remove("2")
+    with pytest.raises(KeyError):
+        txn.update("2", quantity=1)
+
+
+def test_failed_commit_reverts_the_changes_already_applied():
+    inventory = _inventory()
+    txn = Transaction(inventory)
+    txn.update("1", quantity=1)
+    txn.remove("2")
+    txn.add({"id": "3", "name": "Ruler", "price": 2.0, "quantity": 1})
+    # Another change takes the id between staging and commit, so the store refuses the add
+    inventory.add({"id": "3", "name": "Stapler", "price": 3.0, "quantity": 1})
+    start = {it["id"]: it for it in _snapshot(inventory)}
+    with pytest.raises(ValueError):
+        txn.commit()
+    # A removed item that is put back goes to the end of the list
+    assert {it["id"]: it for it in inventory} == start
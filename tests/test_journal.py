@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from inventory import journal
+from inventory.backends import FileBackend
+from inventory.formats import JsonFormat
+
+
+def _backend(tmp_path, recover=lambda n: True):
+    fmt = JsonFormat(str(tmp_path / "inventory.json"))
+    return FileBackend(fmt.load, fmt.save, fmt.path, str(tmp_path / "inventory.json.journal"), recover)
+
+
+def _item(item_id, name="Pen", quantity=5):
+    return {"id": item_id, "name": name, "price": 1.5, "quantity": quantity}
+
+
+def _snapshot(tmp_path):
+    with open(tmp_path / "inventory.json", encoding="utf-8") as f:
+        return json.load(f)["items"]
+
+
+def test_saved_changes_are_replayed_from_the_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "COMPACT_RATIO", 100)  # keep everything in the journal
+    backend = _backend(tmp_path)
+    inventory = backend.load()
+    inventory.add(_item("1"))
+    inventory.add(_item("2", "Pencil"))
+    inventory.update("1", quantity=3)
+    inventory.remove("2")
+    assert backend.save(inventory)
+    backend.close()
+    assert not (tmp_path / "inventory.json").exists()
+    backend = _backend(tmp_path)
+    assert list(backend.load()) == [_item("1", quantity=3)]
+    backend.close()
+
+
+def test_save_appends_to_the_journal_until_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "COMPACT_RATIO", 100)
+    monkeypatch.setattr(journal, "COMPACT_RECORDS", 3)
+    backend = _backend(tmp_path)
+    inventory = backend.load()
+    inventory.add(_item("1"))
+    assert backend.save(inventory)
+    assert not (tmp_path / "inventory.json").exists()  # only the journal was written
+    inventory.add(_item("2"))
+    inventory.add(_item("3"))
+    assert backend.save(inventory)  # three records: folded into a snapshot
+    assert [it["id"] for it in _snapshot(tmp_path)] == ["1", "2", "3"]
+    assert (tmp_path / "inventory.json.journal").stat().st_size == 0
+    backend.close()
+
+
+def test_unsaved_changes_are_recovered_or_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "COMPACT_RATIO", 100)
+    backend = _backend(tmp_path)
+    inventory = backend.load()
+    inventory.add(_item("1"))
+    backend.save(inventory)
+    inventory.add(_item("2"))  # never saved, as if the session crashed here
+    backend.close()
+
+    asked = []
+    backend = _backend(tmp_path, recover=lambda n: asked.append(n) or False)
+    assert [it["id"] for it in backend.load()] == ["1"]
+    assert asked == [1]
+    backend.close()
+    # Dropped changes are gone from the journal too
+    backend = _backend(tmp_path, recover=lambda n: asked.append(n) or True)
+    assert [it["id"] for it in backend.load()] == ["1"]
+    assert asked == [1]
+    backend.close()
+
+
+def test_recovered_changes_are_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "COMPACT_RATIO", 100)
+    backend = _backend(tmp_path)
+    inventory = backend.load()
+    inventory.add(_item("1"))
+    backend.close()
+    backend = _backend(tmp_path, recover=lambda n: True)
+    assert [it["id"] for it in backend.load()] == ["1"]
+    backend.close()
+
+
+def test_torn_last_line_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "COMPACT_RATIO", 100)
+    backend = _backend(tmp_path)
+    inventory = backend.load()
+    inventory.add(_item("1"))
+    backend.save(inventory)
+    backend.close()
+    with open(tmp_path / "inventory.json.journal", "ab") as f:
+        f.write(b'{"op": "put", "item": {"id": "2"')
+    backend = _backend(tmp_path, recover=lambda n: True)
+    assert [it["id"] for it in backend.load()] == ["1"]
+    backend.close()
+
+
+def test_journal_session_locks_out_a_second_one(tmp_path):
+    first = _backend(tmp_path)
+    first.load()
+    try:
+        with pytest.raises(RuntimeError, match="journal mode"):
+            _backend(tmp_path).load()
+    finally:
+        first.close()
+
+
+def test_read_only_sessions_see_saved_changes_while_a_journal_session_is_open(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "COMPACT_RATIO", 100)
+    recovered = []
+    backend = _backend(tmp_path)
+    inventory = backend.load()
+    inventory.add(_item("1"))
+    assert backend.save(inventory)
+    inventory.add(_item("2"))  # not saved yet
+    reader = _backend(tmp_path, recover=recovered.append)
+    assert list(reader.open_read_only()) == [_item("1")]
+    assert recovered == []
+    backend.close()
@@ -0,0 +1,43 @@
+import os
+
+from inventory.lazy import LazyInventory, index_path, open_jsonl, write_jsonl
+
+PEN = {"id": "1", "name": "Pen", "price": 1.5, "quantity": 3}
+
+
+def test_index_answers_before_the_full_load(tmp_path):
+    path = str(tmp_path / "inventory.jsonl")
+    write_jsonl(path, [PEN, dict(PEN, id="2", name="Pencil")], 3)
+    inventory = open_jsonl(path, warm=False)
+    assert isinstance(inventory, LazyInventory)
+    assert (len(inventory), inventory.get("2")["name"], inventory.new_id()) == (2, "Pencil", "3")
+    assert list(inventory) == [PEN, dict(PEN, id="2", name="Pencil")]
+    assert inventory.wait().new_id() == "3"
+    inventory.close()
+
+
+def test_next_id_survives_a_missing_index(tmp_path):
+    # Item 2 was removed, so its ID must not be handed out again
+    path = str(tmp_path / "inventory.jsonl")
+    write_jsonl(path, [PEN], 3)
+    os.remove(index_path(path))
+    inventory = open_jsonl(path)
+    assert list(inventory) == [PEN]
+    assert inventory.new_id() == "3"
+
+
+def test_files_without_a_header_still_load(tmp_path):
+    path = tmp_path / "inventory.jsonl"
+    path.write_text('{"id": "4", "name": "Pen", "price": 1.5, "quantity": 3}\n', encoding="utf-8")
+    inventory = open_jsonl(str(path))
+    assert inventory.get("4")["name"] == "Pen" and inventory.new_id() == "5"
+
+
+def test_bad_records_are_skipped_and_the_warm_up_survives(tmp_path):
+    path = str(tmp_path / "inventory.jsonl")
+    write_jsonl(path, [PEN, {"id": "2", "name": "Broken", "price": 1, "quantity": -4}, {"id": " ", "name": "Blank id", "price": 1, "quantity": 1}], 4)
+    inventory = open_jsonl(path)
+    assert inventory.get("2") is None
+    assert inventory.wait().new_id() == "4"
+    assert list(inventory) == [PEN]
+    assert inventory.search_name("pen") == [PEN]
@@ -0,0 +1,46 @@
+import pytest
+
+from inventory.binary import write_snapshot
+from inventory.columns import ColumnStore
+from inventory.mapped import MappedInventory
+from inventory.store import Inventory
+
+ITEMS = [
+    {"id": "1", "name": "Blue pen", "price": 1.2, "quantity": 40},
+    {"id": "2", "name": "Red pen", "price": 0.9, "quantity": 3, "category": "Stationery"},
+    {"id": "3", "name": "Hammer", "price": 12.5, "quantity": 1, "category": "Tools"},
+    {"id": "4", "name": "Größe Zange", "price": 8.0, "quantity": 0},
+]
+
+
+@pytest.fixture
+def stores(tmp_path):
+    path = str(tmp_path / "inventory.bin")
+    write_snapshot(path, ITEMS, 5)
+    mapped = MappedInventory(path)
+    yield [Inventory.from_items(ITEMS, 5), ColumnStore.from_items(ITEMS), mapped]
+    mapped.close()
+
+
+def _ids(items):
+    return [it["id"] for it in items]
+
+
+def test_mapped_snapshot_reads_back_every_item(stores):
+    mapped = stores[2]
+    assert len(mapped) == len(ITEMS)
+    assert list(mapped) == ITEMS
+    assert mapped.next_id == 5
+    assert mapped.get("3") == ITEMS[2]
+    assert mapped.get("9") is None
+    assert "2" in mapped and "9" not in mapped
+
+
+def test_read_only_stores_answer_like_the_inventory(stores):
+    for store in stores:
+        assert _ids(store.price_range(1.0, 12.5)) == ["1", "4", "3"]
+        assert _ids(store.below_quantity(3)) == ["4", "3"]
+        assert sorted(_ids(store.search_name("PEN"))) == ["1", "2"]
+        assert _ids(store.search_name("red", prefix=True)) == ["2"]
+        assert _ids(store.search_name("zange")) == ["4"]
+        assert [it["id"] for it, _ in store.search_fuzzy("hamer")] == ["3"]
@@ -0,0 +1,13 @@
+from inventory.name_index import NameIndex
+
+
+def test_substring_postings_are_built_on_the_first_search_and_kept_up_to_date():
+    index = NameIndex()
+    index.add("1", "Blue pen")
+    index.add("2", "Pencil")
+    assert index._grams is None  # loading and editing never build them
+    assert sorted(index.search("pen")) == ["1", "2"]
+    index.add("3", "Open sign")
+    index.remove("2")
+    assert sorted(index.search("pen")) == ["1", "3"]
+    assert index.search("pe", prefix=True) == []
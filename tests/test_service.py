@@ -0,0 +1,173 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from inventory.backends import FileBackend, open_backend
+from inventory.formats import JsonFormat
+from inventory.service import InventoryService
+
+
+async def _request(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def _raw(method, path, body=None, headers=""):
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    head = f"{method} {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(data)}\r\n{headers}\r\n"
+    return head.encode("latin-1") + data
+
+
+@pytest.fixture
+def call(tmp_path):
+    """Runs requests against a fresh service; call(*requests) returns their (status, payload)."""
+    fmt = JsonFormat(str(tmp_path / "inventory.json"))
+    history = str(tmp_path / "inventory.json.history")
+
+    def run(*requests):
+        async def main():
+            service = InventoryService(open_backend(fmt, history_path=history), flush_interval=60)
+            port = await service.start("127.0.0.1", 0)
+            try:
+                return [await _request(port, r if isinstance(r, bytes) else _raw(*r)) for r in requests]
+            finally:
+                await service.stop()
+        return asyncio.run(main())
+    return run
+
+
+PEN = {"name": "Pen", "price": 1.5, "quantity": 3}
+
+
+def test_item_routes(call):
+    responses = call(
+        ("POST", "/items", PEN),
+        ("GET", "/items/1"),
+        ("PATCH", "/items/1", {"quantity": 2, "category": "Office"}),
+        ("GET", "/items?offset=0&limit=10"),
+        ("DELETE", "/items/1"),
+        ("GET", "/items/1"),
+    )
+    assert responses[0] == (201, dict(PEN, id="1"))
+    assert responses[1] == (200, dict(PEN, id="1"))
+    assert responses[2] == (200, dict(PEN, id="1", quantity=2, category="Office"))
+    assert responses[3] == (200, {"total": 1, "items": [responses[2][1]]})
+    assert responses[4][0] == 200
+    assert responses[5] == (404, {"error": "item not found"})
+
+
+def test_changes_are_saved(call, tmp_path):
+    call(("POST", "/items", PEN), ("POST", "/save"))
+    with open(tmp_path / "inventory.json", encoding="utf-8") as f:
+        assert json.load(f)["items"] == [dict(PEN, id="1")]
+
+
+def test_search_and_reports(call):
+    responses = call(
+        ("POST", "/items", PEN),
+        ("POST", "/items", {"name": "Hammer", "price": 12.0, "quantity": 10}),
+        ("GET", "/search?name=pe"),
+        ("GET", "/search?min_price=10&max_price=20"),
+        ("GET", "/search?name=hamer&fuzzy=1"),
+        ("GET", "/reports/low-stock?threshold=5"),
+        ("GET", "/reports/valuation"),
+        ("PATCH", "/items/2", {"quantity": 4}),
+        ("GET", "/reports/forecast?lead_days=7"),
+    )
+    assert [it["name"] for it in responses[2][1]["items"]] == ["Pen"]
+    assert [it["name"] for it in responses[3][1]["items"]] == ["Hammer"]
+    assert [it["name"] for it in responses[4][1]["items"]] == ["Hammer"]
+    assert [it["name"] for it in responses[5][1]["items"]] == ["Pen"]
+    assert responses[6][1]["value"] == pytest.approx(124.5)
+    [hammer] = responses[8][1]["items"]
+    assert hammer["name"] == "Hammer" and hammer["reorder"]
+
+
+@pytest.mark.parametrize("request_, status", [
+    (("GET", "/items?offset=-1"), 400),
+    (("GET", "/items?limit=-1"), 400),
+    (("GET", "/items?limit=ten"), 400),
+    (("GET", "/search?name=pen&fuzzy=1&top=-1"), 400),
+    (("GET", "/search?min_price=1"), 400),
+    (("GET", "/reports/forecast?lead_days=nan"), 400),
+    (("POST", "/items", {"name": "Pen", "price": "nan", "quantity": 1}), 400),
+    (("POST", "/items", {"name": "Pen", "price": 1, "quantity": 2.5}), 400),
+    (("POST", "/items", {"name": "", "price": 1, "quantity": 1}), 400),
+    (("POST", "/items", {"name": "Two\nlines", "price": 1, "quantity": 1}), 400),
+    (("POST", "/items", {"name": "Pen", "price": 1, "quantity": 1, "category": "Off\rice"}), 400),
+    (("PATCH", "/items/9", {"quantity": 1}), 404),
+    (("PATCH", "/items/9", {"name": "Two\nlines"}), 400),
+    (("GET", "/nothing-here"), 404),
+    (("PUT", "/items"), 405),
+    (b"POST /items HTTP/1.1\r\nConnection: close\r\nContent-Length: 4\r\n\r\n[1]\n", 400),
+    (b"POST /items HTTP/1.1\r\nConnection: close\r\nContent-Length: 5\r\n\r\n{oops", 400),
+    (b"GET /items HTTP/1.1\r\nContent-Length: abc\r\n\r\n", 400),
+    (b"GET /items HTTP/1.1\r\nContent-Length: -1\r\n\r\n", 400),
+    (b"POST /items HTTP/1.1\r\nContent-Length: 99999999\r\n\r\n", 413),
+])
+def test_bad_requests_get_an_error_status(call, request_, status):
+    [(got, payload)] = call(request_)
+    assert got == status
+    assert "error" in payload
+
+
+def test_duplicate_id_is_a_conflict(call):
+    responses = call(("POST", "/items", dict(PEN, id="7")), ("POST", "/items", dict(PEN, id="7")))
+    assert [status for status, _ in responses] == [201, 409]
+
+
+def test_a_failing_handler_is_a_500_and_the_service_keeps_going(call, monkeypatch):
+    def broken(self, low, high):
+        raise TypeError("bug")
+
+    monkeypatch.setattr("inventory.store.Inventory.price_range", broken)
+    responses = call(("GET", "/search?min_price=1&max_price=2"), ("POST", "/items", PEN))
+    assert responses[0] == (500, {"error": "internal error"})
+    assert responses[1][0] == 201
+
+
+def test_a_save_merges_other_sessions_changes_on_the_loop(tmp_path, monkeypatch):
+    fmt = JsonFormat(str(tmp_path / "inventory.json"))
+    threads = []
+    merge = FileBackend._apply
+
+    def apply(self, inventory, disk):
+        threads.append(threading.current_thread())
+        return merge(self, inventory, disk)
+
+    monkeypatch.setattr(FileBackend, "_apply", apply)
+
+    async def main():
+        service = InventoryService(open_backend(fmt), flush_interval=60)
+        port = await service.start("127.0.0.1", 0)
+        try:
+            other = open_backend(fmt)
+            inventory = other.load()
+            inventory.add(dict(PEN, id="5"))
+            assert other.save(inventory)
+            await _request(port, _raw("POST", "/items", {"name": "Ruler", "price": 2.0, "quantity": 1}))
+            await _request(port, _raw("POST", "/save"))
+            return await _request(port, _raw("GET", "/items/5"))
+        finally:
+            await service.stop()
+
+    assert asyncio.run(main()) == (200, dict(PEN, id="5"))
+    assert threads == [threading.main_thread()]
+
+
+def test_valuation_can_verify_the_running_totals(call):
+    responses = call(
+        ("POST", "/items", dict(PEN, category="Office")),
+        ("PATCH", "/items/1", {"category": "Desk"}),
+        ("GET", "/reports/valuation?verify=1"),
+    )
+    status, report = responses[2]
+    assert status == 200 and report["problems"] == []
+    assert list(report["categories"]) == ["Desk"]
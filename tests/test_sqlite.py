@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from inventory.migrate import main, migrate
+from inventory.sqlite_store import SqliteBackend, SqliteInventory
+
+PEN = {"id": "1", "name": "Pen", "price": 1.5, "quantity": 3, "category": "Office"}
+HAMMER = {"id": "2", "name": "Hammer", "price": 12.0, "quantity": 10}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SqliteInventory(str(tmp_path / "inventory.db"))
+    yield store
+    store.close()
+
+
+def test_queries_run_against_the_database(store):
+    store.extend([PEN, HAMMER, {"id": "7", "name": "Pencil", "price": 0.5, "quantity": 1}])
+    assert len(store) == 3 and "7" in store and store.get("2") == HAMMER
+    assert store.new_id() == "8"
+    assert [it["id"] for it in store.search_name("PEN")] == ["1", "7"]
+    assert [it["id"] for it in store.search_name("pe", prefix=True)] == ["1", "7"]
+    assert [it["id"] for it in store.price_range(1, 20)] == ["1", "2"]
+    assert [it["id"] for it in store.below_quantity(5)] == ["7", "1"]
+    assert store.price_bounds() == (0.5, 12.0)
+    assert store.max_name_length() == 6
+
+
+def test_changes_notify_listeners_and_keep_fuzzy_search_in_step(store):
+    events = []
+    store.listeners.append(lambda op, item_id, old, new: events.append((op, item_id)))
+    store.add(PEN)
+    assert store.search_fuzzy("pens")[0][0] == PEN  # builds the in-memory name index
+    store.update("1", name="Stapler", category="")
+    assert store.get("1") == {"id": "1", "name": "Stapler", "price": 1.5, "quantity": 3}
+    assert [it["id"] for it, _ in store.search_fuzzy("stapler")] == ["1"]
+    with pytest.raises(ValueError):
+        store.add(dict(PEN, name="Again"))
+    store.remove("1")
+    assert store.search_fuzzy("stapler") == []
+    assert events == [("add", "1"), ("update", "1"), ("remove", "1")]
+    assert store.new_id() == "2"  # removed IDs stay retired
+
+
+def test_backend_saves_nothing_but_runs_the_save_hooks(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "inventory.db"))
+    saved = []
+    backend.on_save.append(lambda: saved.append(True))
+    inventory = backend.load()
+    inventory.add(PEN)
+    assert backend.save(inventory) and saved == [True]
+    backend.close()
+    backend = SqliteBackend(str(tmp_path / "inventory.db"))
+    assert list(backend.load()) == [PEN]
+    backend.close()
+
+
+def test_migrate_json_keeps_the_id_high_water_mark(tmp_path):
+    source = tmp_path / "inventory.json"
+    source.write_text(json.dumps({"next_id": "9", "items": [PEN, HAMMER]}), encoding="utf-8")
+    db = str(tmp_path / "inventory.db")
+    assert migrate(str(source), db) == 2
+    assert migrate(str(source), db) == 0  # IDs already in the database are skipped
+    store = SqliteInventory(db)
+    assert list(store) == [PEN, HAMMER] and store.new_id() == "9"
+    store.close()
+
+
+def test_migrate_csv_reads_the_meta_sidecar(tmp_path):
+    source = tmp_path / "inventory.csv"
+    source.write_text("id,name,price,quantity,category\n1,Pen,1.5,3,Office\n", encoding="utf-8")
+    (tmp_path / "inventory.csv.meta").write_text('{"next_id": 5}', encoding="utf-8")
+    db = str(tmp_path / "inventory.db")
+    assert migrate(str(source), db) == 1
+    store = SqliteInventory(db)
+    assert list(store) == [PEN] and store.new_id() == "5"
+    store.close()
+
+
+def test_migrate_rejects_an_invalid_item_and_adds_nothing(tmp_path, capsys):
+    source = tmp_path / "inventory.json"
+    source.write_text(json.dumps([PEN, dict(HAMMER, quantity=-1)]), encoding="utf-8")
+    db = str(tmp_path / "inventory.db")
+    assert main([str(source), db]) == 1
+    assert "item 2: Quantity must be non-negative." in capsys.readouterr().err
+    store = SqliteInventory(db)
+    assert len(store) == 0
+    store.close()
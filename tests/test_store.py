@@ -0,0 +1,68 @@
+import pytest
+
+from inventory.store import Inventory, SortedIndex
+
+
+def _item(item_id, name="Pen", price=1.0, quantity=5):
+    return {"id": item_id, "name": name, "price": price, "quantity": quantity}
+
+
+def test_sorted_index_keeps_pairs_in_order():
+    index = SortedIndex([(3, "c"), (1, "a"), (2, "b")])
+    index.insert(2, "a")
+    index.extend([(0, "z"), (5, "y")])
+    assert index.between(0, 5) == ["z", "a", "a", "b", "c", "y"]
+    index.remove(2, "a")
+    assert index.between(2, 2) == ["b"]
+    assert len(index) == 5 and index.bounds() == (0, 5)
+    with pytest.raises(KeyError):
+        index.remove(2, "a")  # not there any more; must not delete (2, "b") instead
+    assert index.between(2, 2) == ["b"]
+    assert SortedIndex().bounds() == (None, None)
+
+
+def test_between_includes_both_ends_and_below_excludes_its_bound():
+    index = SortedIndex([(1.0, "a"), (2.0, "b"), (2.0, "c"), (3.0, "d")])
+    assert index.between(2.0, 3.0) == ["b", "c", "d"]
+    assert index.between(1.5, 1.9) == []
+    assert index.between(3.0, 1.0) == []
+    assert index.below(2.0) == ["a"]
+    assert index.below(2.5) == ["a", "b", "c"]
+    assert index.below(1.0) == []
+
+
+def test_removal_holes_are_compacted_without_changing_the_order():
+    inventory = Inventory.from_items(_item(str(i)) for i in range(100))
+    removed = [str(i) for i in range(0, 100, 3)] + [str(i) for i in range(1, 79, 3)]
+    for i, item_id in enumerate(removed):
+        inventory.remove(item_id)
+        if i == 30:
+            assert inventory._holes == 31 and len(inventory._items) == 100  # not compacted yet
+    left = [str(i) for i in range(100) if str(i) not in removed]
+    assert inventory._holes == 9 and len(inventory._items) == 49  # compacted at the 51st removal
+    assert [it["id"] for it in inventory] == left
+    assert all(inventory.get(item_id)["id"] == item_id for item_id in left)
+    assert inventory.get("0") is None and len(inventory) == len(left)
+    inventory.add(_item("200"))
+    assert [it["id"] for it in inventory][-1] == "200" and inventory.new_id() == "201"
+
+
+def test_price_and_quantity_queries_follow_updates():
+    inventory = Inventory.from_items([_item("1", price=3.0, quantity=2), _item("2", price=1.0, quantity=9)])
+    inventory.add(_item("3", price=2.0, quantity=1))
+    inventory.update("2", price=5.0, quantity=0)
+    assert [it["id"] for it in inventory.price_range(2.0, 5.0)] == ["3", "1", "2"]
+    assert [it["id"] for it in inventory.below_quantity(2)] == ["2", "3"]
+    assert inventory.price_bounds() == (2.0, 5.0)
+
+
+def test_name_search_after_a_rename():
+    inventory = Inventory.from_items([_item("1", "Blue pen"), _item("2", "Stapler")])
+    assert [it["id"] for it in inventory.search_name("pen")] == ["1"]
+    inventory.update("1", name="Red marker")
+    inventory.update("2", name="Pencil sharpener")
+    assert [it["id"] for it in inventory.search_name("pen")] == ["2"]
+    assert [it["id"] for it in inventory.search_name("MARK")] == ["1"]
+    assert [it["id"] for it in inventory.search_name("re", prefix=True)] == ["1"]
+    assert inventory.max_name_length() == len("Pencil sharpener")
+    assert inventory.search_fuzzy("markr")[0][0]["id"] == "1"